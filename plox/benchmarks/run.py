@@ -0,0 +1,111 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PLOX = os.path.join(os.path.dirname(DIRECTORY), "plox")
+
+
+def run_once(path, flags):
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, PLOX, "--no-cache"] + flags + [path],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    error = process.stderr.read().decode(errors="replace")
+    process.stderr.close()
+    if process.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(path)} exited with {process.returncode}\n{error}")
+    return elapsed, usage.ru_maxrss
+
+
+def run_benchmark(path, flags, repeat):
+    times = []
+    peak = 0
+    for _ in range(repeat):
+        elapsed, maxrss = run_once(path, flags)
+        times.append(elapsed)
+        peak = max(peak, maxrss)
+    return {
+        "times": times,
+        "median": statistics.median(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "peak_rss_kb": peak,
+    }
+
+
+def benchmark_paths(names):
+    paths = sorted(glob.glob(os.path.join(DIRECTORY, "*.lox")))
+    if names:
+        paths = [path for path in paths if os.path.splitext(os.path.basename(path))[0] in names]
+    return paths
+
+
+def run(args):
+    flags = args.flags.split()
+    results = {}
+    print(f"{'benchmark':<18} {'median':>9} {'stddev':>9} {'peak rss':>10}")
+    for path in benchmark_paths(args.names):
+        name = os.path.splitext(os.path.basename(path))[0]
+        result = results[name] = run_benchmark(path, flags, args.repeat)
+        print(f"{name:<18} {result['median']:8.3f}s {result['stddev']:8.3f}s {result['peak_rss_kb'] / 1024:8.1f}MB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "flags": flags,
+                "repeat": args.repeat,
+                "results": results,
+            }, f, indent=2)
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.current) as f:
+        current = json.load(f)["results"]
+    regressions = 0
+    print(f"{'benchmark':<18} {'baseline':>9} {'current':>9} {'change':>8}")
+    for name in sorted(baseline.keys() & current.keys()):
+        before = baseline[name]["median"]
+        after = current[name]["median"]
+        change = after / before - 1
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  improved"
+        print(f"{name:<18} {before:8.3f}s {after:8.3f}s {change:+7.1%}{flag}")
+    if regressions:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the plox benchmark suite.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run benchmarks and optionally save results")
+    run_parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--flags", default="", help="extra plox flags, e.g. --flags='--vm -O'")
+    run_parser.add_argument("--output", help="write results to this JSON file")
+    run_parser.set_defaults(handler=run)
+    compare_parser = subparsers.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.05,
+                                help="relative slowdown of the median that counts as a regression")
+    compare_parser.set_defaults(handler=compare)
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
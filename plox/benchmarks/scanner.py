@@ -0,0 +1,173 @@
+import glob
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Iterator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lox.error import ErrorHandler
+from lox.scanner import Scanner
+from lox.token import Token
+from lox.tokentype import TokenType
+
+REPEAT = 5
+TARGET_SIZE = 4 * 1024 * 1024
+
+
+def is_alpha(c):
+    return c >= 'a' and c <= 'z' or c >= 'A' and c <= 'Z' or c == '_'
+
+
+def is_digit(c):
+    return c >= '0' and c <= '9'
+
+
+def is_alpha_digit(c):
+    return is_alpha(c) or is_digit(c)
+
+
+# The per-character scanner Scanner.scan replaced, kept as the baseline the
+# regex scanner is measured against.
+class CharacterScanner(Scanner):
+    def __init__(self, source: str, error_handler: ErrorHandler) -> None:
+        super().__init__(source, error_handler)
+        self.start = 0
+        self.current = 0
+
+    def scan_by_character(self) -> Iterator[Token]:
+        while not self.is_at_end():
+            self.start = self.current
+            token = self.scan_token()
+            if token is not None:
+                yield token
+        yield Token(TokenType.EOF, '', None, self.line)
+
+    def scan_token(self) -> Token | None:
+        c: str = self.advance()
+        match c:
+            case '(': return self.make_token(TokenType.LEFT_PAREN)
+            case ')': return self.make_token(TokenType.RIGHT_PAREN)
+            case '{': return self.make_token(TokenType.LEFT_BRACE)
+            case '}': return self.make_token(TokenType.RIGHT_BRACE)
+            case ',': return self.make_token(TokenType.COMMA)
+            case '.': return self.make_token(TokenType.DOT)
+            case '-': return self.make_token(TokenType.MINUS)
+            case '+': return self.make_token(TokenType.PLUS)
+            case ';': return self.make_token(TokenType.SEMICOLON)
+            case '*': return self.make_token(TokenType.STAR)
+            case '!': return self.make_token(TokenType.BANG_EQUAL if self.match('=') else TokenType.BANG)
+            case '=': return self.make_token(TokenType.EQUAL_EQUAL if self.match('=') else TokenType.EQUAL)
+            case '<': return self.make_token(TokenType.LESS_EQUAL if self.match('=') else TokenType.LESS)
+            case '>': return self.make_token(TokenType.GREATER_EQUAL if self.match('=') else TokenType.GREATER)
+            case '/':
+                if self.match('/'):
+                    while self.peek() != '\n' and not self.is_at_end():
+                        self.advance()
+                else:
+                    return self.make_token(TokenType.SLASH)
+            case ' ':
+                pass
+            case '\r':
+                pass
+            case '\t':
+                pass
+            case '\n': self.line += 1
+            case '"': return self.string()
+            case _:
+                if is_digit(c):
+                    return self.number()
+                elif is_alpha(c):
+                    return self.identifier()
+                else:
+                    self.error_handler.error_at_line(self.line, "Unexpected character.")
+        return None
+
+    def identifier(self) -> Token:
+        while is_alpha_digit(self.peek()):
+            self.advance()
+        text: str = sys.intern(self.source[self.start:self.current])
+        type: TokenType = self.keywords.get(text, TokenType.IDENTIFIER)
+        return Token(type, text, None, self.line)
+
+    def number(self) -> Token:
+        while is_digit(self.peek()):
+            self.advance()
+        if self.peek() == '.' and is_digit(self.peek_next()):
+            self.advance()
+            while is_digit(self.peek()):
+                self.advance()
+        return self.make_token(TokenType.NUMBER, float(self.source[self.start:self.current]))
+
+    def string(self) -> Token | None:
+        while self.peek() != '"' and not self.is_at_end():
+            if self.peek() == '\n':
+                self.line += 1
+            self.advance()
+        if self.is_at_end():
+            self.error_handler.error_at_line(self.line, "Unterminated string.")
+            return None
+
+        self.advance()
+
+        value: str = self.source[self.start+1:self.current-1]
+        return self.make_token(TokenType.STRING, value)
+
+    def match(self, expected: str) -> bool:
+        if self.is_at_end() or self.source[self.current] != expected:
+            return False
+        self.current += 1
+        return True
+
+    def peek(self) -> str:
+        return self.source[self.current] if not self.is_at_end() else '\0'
+
+    def peek_next(self) -> str:
+        return self.source[self.current + 1] if self.current + 1 < len(self.source) else '\0'
+
+    def is_at_end(self) -> bool:
+        return self.current >= len(self.source)
+
+    def advance(self) -> str:
+        self.current += 1
+        return self.source[self.current-1]
+
+    def make_token(self, type: TokenType, literal: object | None = None) -> Token:
+        text: str = self.source[self.start:self.current]
+        return Token(type, text, literal, self.line)
+
+
+def load_source(paths):
+    if not paths:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        paths = sorted(glob.glob(os.path.join(directory, "*.lox")))
+    parts = []
+    for path in paths:
+        with open(path) as f:
+            parts.append(f.read())
+    text = "\n".join(parts)
+    return text * max(1, TARGET_SIZE // len(text))
+
+
+def throughput(source, scanner, scan):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        deque(scan(scanner(source, ErrorHandler())), maxlen=0)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(source.encode()) / best / (1024 * 1024)
+
+
+def main():
+    source = load_source(sys.argv[1:])
+    print(f"source: {len(source.encode()) / (1024 * 1024):.1f} MB")
+    character = throughput(source, CharacterScanner, CharacterScanner.scan_by_character)
+    print(f"scan_by_character: {character:8.2f} MB/s")
+    fast = throughput(source, Scanner, Scanner.scan)
+    print(f"scan:              {fast:8.2f} MB/s ({fast / character:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+PLOX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "plox")
+SHORT = "var sum = 0; for (var i = 0; i < 200; i = i + 1) sum = sum + i; print sum;"
+HOG = "var i = 0; while (true) i = i + 1;"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def request(reader, writer, source, timeout=None):
+    message = {"source": source}
+    if timeout is not None:
+        message["timeout"] = timeout
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def client(port, count, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await request(reader, writer, SHORT)
+        latencies.append(time.perf_counter() - start)
+        if response["status"] != 0:
+            raise RuntimeError(f"request failed: {response}")
+    writer.close()
+
+
+async def hog(port, timeout, results):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    results.append(await request(reader, writer, HOG, timeout))
+    writer.close()
+
+
+async def load(args, port):
+    latencies = []
+    hogs = []
+    looping = [asyncio.create_task(hog(port, args.hog_timeout, hogs)) for _ in range(args.hogs)]
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    await asyncio.gather(*[client(port, args.requests, latencies) for _ in range(args.clients)])
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*looping)
+    return elapsed, latencies, hogs
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive plox serve with concurrent clients and report latency and throughput.")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--hogs", type=int, default=1, help="clients running an endless loop alongside")
+    parser.add_argument("--hog-timeout", type=float, default=5.0)
+    parser.add_argument("--slice", type=int, default=1000)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, PLOX, "serve", "--port", str(port), "--slice", str(args.slice)],
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        server.stdout.readline()
+        elapsed, latencies, hogs = asyncio.run(load(args, port))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{len(latencies)} requests from {args.clients} clients with {args.hogs} looping, slice {args.slice}")
+    print(f"throughput: {len(latencies) / elapsed:8.1f} req/s over {elapsed:.2f}s")
+    print(f"latency:    p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms"
+          f"  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  max {max(latencies) * 1000:7.1f} ms")
+    print(f"            mean {statistics.mean(latencies) * 1000:6.1f} ms")
+    for response in hogs:
+        print(f"looping client: status {response['status']}, {response['statements']} statements, "
+              f"{response['seconds']:.2f}s, {response['errors'].strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PLOX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "plox")
+COMMAND = [PLOX, "-c", "print 1;"]
+
+
+def wall_times(command, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + command, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def import_times(command):
+    result = subprocess.run([sys.executable, "-X", "importtime"] + command,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start of plox -c 'print 1;'.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget", type=float, help="fail if plox adds more than this many ms over bare python")
+    args = parser.parse_args()
+
+    python = statistics.median(wall_times(["-c", "pass"], args.repeat))
+    plox = statistics.median(wall_times(COMMAND, args.repeat))
+    overhead = plox - python
+    print(f"python -c pass:       {python:7.1f} ms")
+    print(f"plox -c 'print 1;':   {plox:7.1f} ms")
+    print(f"plox overhead:        {overhead:7.1f} ms")
+    print("top-level imports (cumulative):")
+    for cumulative, name in import_times(COMMAND)[:10]:
+        print(f"  {cumulative:7.1f} ms  {name}")
+    if args.budget is not None and overhead > args.budget:
+        print(f"startup budget of {args.budget:.1f} ms exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
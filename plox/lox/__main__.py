@@ -0,0 +1,3 @@
+from lox.main import main
+
+main()
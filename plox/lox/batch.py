@@ -0,0 +1,124 @@
+import argparse
+import importlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from lox.runtime import LoxRuntime
+
+# Exit status for a script that cannot be read, from the same sysexits.h
+# family as the 64/65/70 statuses plox already uses.
+EX_NOINPUT = 66
+
+# LoxRuntime arguments for every script this worker runs, set by warm_up.
+options = {}
+
+
+class Result:
+    __slots__ = ("path", "status", "stdout", "stderr", "seconds")
+
+    def __init__(self, path: str, status: int, stdout: str, stderr: str, seconds: float) -> None:
+        self.path = path
+        self.status = status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.seconds = seconds
+
+
+def warm_up(backend: str, optimize: bool, use_cache: bool, max_depth: int | None) -> None:
+    options.update(backend=backend, optimize=optimize, use_cache=use_cache, max_depth=max_depth)
+    # Preload the modules scripts will need, so the first script each worker
+    # runs does not pay for importing them.
+    modules = ["lox.scanner", "lox.parser", "lox.resolver", "lox.interpreter"]
+    if optimize:
+        modules.append("lox.optimizer")
+    if use_cache:
+        modules.append("lox.cache")
+    if backend == "closure":
+        modules.append("lox.closure_compiler")
+    elif backend == "vm":
+        modules += ["lox.compiler", "lox.vm"]
+    for module in modules:
+        importlib.import_module(module)
+
+
+def run_script(path: str) -> Result:
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    runtime = LoxRuntime(**options, out=stdout, err=stderr)
+    start = time.perf_counter()
+    try:
+        status = runtime.run_file(path)
+    except OSError as e:
+        stderr.write(f"Could not read {path}: {e.strerror}\n")
+        status = EX_NOINPUT
+    # Any other exception is a bug in plox, not in the script; it is reported
+    # as that script's failure instead of taking down the whole batch.
+    except Exception:
+        traceback.print_exc(file=stderr)
+        status = 70
+    return Result(path, status, stdout.getvalue(), stderr.getvalue(), time.perf_counter() - start)
+
+
+def read_manifest(manifest: str) -> list[str]:
+    directory = os.path.dirname(manifest)
+    paths = []
+    with open(manifest, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(os.path.join(directory, line))
+    return paths
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="plox batch", description="Run many Lox scripts on a pool of worker processes.")
+    parser.add_argument("scripts", nargs="*", help="Lox scripts to run")
+    parser.add_argument("--manifest", action="append", default=[], help="file listing one script per line, relative to the manifest")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes (default: number of cores)")
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument("--closure", dest="backend", action="store_const", const="closure", default="interpreter")
+    backend.add_argument("--vm", dest="backend", action="store_const", const="vm")
+    parser.add_argument("-O", "--optimize", action="store_true")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="do not read or write __loxcache__; cached programs are trusted code, so use this "
+                             "for scripts in directories other users can write to")
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--show-output", action="store_true", help="echo each script's captured output after its result line")
+    parser.add_argument("--output", help="write every result, including captured output, to this JSON file")
+    args = parser.parse_args(argv)
+
+    paths = list(args.scripts)
+    for manifest in args.manifest:
+        paths += read_manifest(manifest)
+    if not paths:
+        parser.error("no scripts given")
+    jobs = max(1, min(args.jobs, len(paths)))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(jobs, initializer=warm_up,
+                             initargs=(args.backend, args.optimize, args.use_cache, args.max_depth)) as executor:
+        results = []
+        for result in executor.map(run_script, paths, chunksize=max(1, len(paths) // (jobs * 16))):
+            results.append(result)
+            print(f"{result.status:>4} {result.seconds:8.3f}s  {result.path}")
+            if args.show_output:
+                sys.stdout.write(result.stdout)
+                sys.stdout.write(result.stderr)
+    elapsed = time.perf_counter() - start
+
+    failed = sum(1 for result in results if result.status != 0)
+    total = sum(result.seconds for result in results)
+    print(f"{len(results)} scripts, {failed} failed, {total:.3f}s in scripts, {elapsed:.3f}s wall on {jobs} workers")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "jobs": jobs,
+                "wall": elapsed,
+                "results": [{name: getattr(result, name) for name in Result.__slots__} for result in results],
+            }, f, indent=2)
+    sys.exit(max(result.status for result in results))
@@ -0,0 +1,80 @@
+import hashlib
+import os
+import pickle
+import stat
+
+from lox import __version__
+import lox.stmt as Stmt
+from lox.environment import GlobalCell, GlobalEnvironment
+
+CACHE_DIRECTORY = "__loxcache__"
+# Bump when the shape of the pickled tree changes without a new release.
+CACHE_FORMAT = 3
+CACHE_TAG = f"plox-{__version__}-{CACHE_FORMAT}"
+
+
+def cache_path(filename: str) -> str:
+    directory, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, CACHE_DIRECTORY, f"{name}.{CACHE_TAG}.pickle")
+
+
+def source_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+# Global cells belong to the running interpreter, so they are written by name
+# and rebound to the current globals when the program is loaded.
+class ProgramPickler(pickle.Pickler):
+    def persistent_id(self, obj):
+        if obj.__class__ is GlobalCell:
+            return obj.name
+        return None
+
+
+class ProgramUnpickler(pickle.Unpickler):
+    def __init__(self, file, globals: GlobalEnvironment) -> None:
+        super().__init__(file)
+        self.globals = globals
+
+    def persistent_load(self, name: str) -> GlobalCell:
+        return self.globals.cell(name)
+
+
+# Loading a cache file runs whatever it contains, so only files this user owns
+# and nobody else can write are trusted. The header check does not help here:
+# anyone who can write the file can also fake the header.
+def trusted(f) -> bool:
+    if not hasattr(os, "getuid"):
+        return True
+    info = os.fstat(f.fileno())
+    return info.st_uid == os.getuid() and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def load(filename: str, source: str, globals: GlobalEnvironment) -> list[Stmt.Stmt] | None:
+    try:
+        with open(cache_path(filename), "rb") as f:
+            if not trusted(f):
+                return None
+            if pickle.load(f) != (CACHE_TAG, source_hash(source)):
+                return None
+            return ProgramUnpickler(f, globals).load()
+    # A missing, stale or corrupt cache file can fail in any number of ways
+    # while unpickling; all of them just mean compiling the source again.
+    except Exception:
+        return None
+
+
+def store(filename: str, source: str, statements: list[Stmt.Stmt]) -> None:
+    path = cache_path(filename)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with os.fdopen(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644), "wb") as f:
+            pickle.dump((CACHE_TAG, source_hash(source)), f)
+            ProgramPickler(f, pickle.HIGHEST_PROTOCOL).dump(statements)
+        os.replace(temporary, path)
+    except (OSError, pickle.PicklingError, RecursionError):
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
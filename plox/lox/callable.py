@@ -1,5 +1,4 @@
 from abc import ABC, abstractmethod
-from typing import List
 
 class LoxCallable(ABC):
     @abstractmethod
@@ -7,7 +6,7 @@ class LoxCallable(ABC):
         pass
 
     @abstractmethod
-    def call(self, interpreter, arguments: List[object]) -> object:
+    def call(self, interpreter, arguments: list[object]) -> object:
         pass
 
     
\ No newline at end of file
@@ -0,0 +1,77 @@
+from array import array
+
+OP_CONSTANT = 0
+OP_NIL = 1
+OP_TRUE = 2
+OP_FALSE = 3
+OP_POP = 4
+OP_GET_LOCAL = 5
+OP_SET_LOCAL = 6
+OP_GET_GLOBAL = 7
+OP_DEFINE_GLOBAL = 8
+OP_SET_GLOBAL = 9
+OP_GET_UPVALUE = 10
+OP_SET_UPVALUE = 11
+OP_GET_PROPERTY = 12
+OP_SET_PROPERTY = 13
+OP_GET_SUPER = 14
+OP_EQUAL = 15
+OP_NOT_EQUAL = 16
+OP_GREATER = 17
+OP_GREATER_EQUAL = 18
+OP_LESS = 19
+OP_LESS_EQUAL = 20
+OP_ADD = 21
+OP_SUBTRACT = 22
+OP_MULTIPLY = 23
+OP_DIVIDE = 24
+OP_NOT = 25
+OP_NEGATE = 26
+OP_PRINT = 27
+OP_JUMP = 28
+OP_JUMP_IF_FALSE = 29
+OP_LOOP = 30
+OP_CALL = 31
+OP_INVOKE = 32
+OP_SUPER_INVOKE = 33
+OP_CLOSURE = 34
+OP_CLOSE_UPVALUE = 35
+OP_RETURN = 36
+OP_CLASS = 37
+OP_INHERIT = 38
+OP_METHOD = 39
+
+
+class Chunk:
+    def __init__(self) -> None:
+        self.code = bytearray()
+        self.lines = array('i')
+        self.constants: list[object] = []
+        self.strings: dict[str, int] = {}
+
+    def write(self, byte: int, line: int) -> None:
+        self.code.append(byte)
+        self.lines.append(line)
+
+    def add_constant(self, value: object) -> int:
+        if isinstance(value, str):
+            index = self.strings.get(value)
+            if index is None:
+                index = self.strings[value] = len(self.constants)
+                self.constants.append(value)
+            return index
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+
+class ObjFunction:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.arity = 0
+        self.upvalue_count = 0
+        self.chunk = Chunk()
+
+    def __repr__(self) -> str:
+        if self.name is None:
+            return "<script>"
+        return f"<fn: {self.name}>"
@@ -0,0 +1,443 @@
+from collections.abc import Callable
+
+import lox.expr as Expr
+import lox.stmt as Stmt
+from lox.error import *
+from lox.tokentype import TokenType
+from lox.token import Token
+from lox.environment import Environment, UNDEFINED
+from lox.callable import LoxCallable
+from lox.loxfun import LoxFunction
+from lox.loxinstance import LoxInstance
+from lox.loxclass import LoxClass
+from lox.inline_cache import InlineCache, StoreCache
+from lox.interpreter import Interpreter, Return, TailCall, raise_recursion_limit, is_truthy, is_equal, stringify, check_number_operand, NUMBER_OPERATORS
+
+Code = Callable[[Environment], object]
+
+
+class CompiledFunction(LoxFunction):
+    def __init__(self, declaration: Stmt.Function, closure: Environment, is_initializer: bool, body: list[Code]) -> None:
+        super().__init__(declaration, closure, is_initializer)
+        self.body = body
+
+    def call(self, interpreter, arguments: list[object]) -> object:
+        completion = execute_body(interpreter, self, Environment(self.closure, list(arguments)))
+        if self.is_initializer:
+            return self.closure.values[0]
+        if completion is not None:
+            return completion.value
+        return None
+
+    def call_method(self, interpreter, instance, arguments: list[object]) -> object:
+        completion = execute_body(interpreter, self, Environment(Environment(self.closure, [instance]), list(arguments)))
+        if self.is_initializer:
+            return instance
+        if completion is not None:
+            return completion.value
+        return None
+
+    def bind(self, instance):
+        environment = Environment(self.closure)
+        environment.define("this", instance)
+        return CompiledFunction(self.declaration, environment, self.is_initializer, self.body)
+
+
+def execute_body(interpreter: Interpreter, function: CompiledFunction, environment: Environment) -> Return | None:
+    if interpreter.depth == interpreter.max_depth:
+        raise ErrorAtRuntime(function.declaration.name, "Stack overflow.")
+    interpreter.depth += 1
+    try:
+        while True:
+            completion = None
+            for statement in function.body:
+                completion = statement(environment)
+                if completion is not None:
+                    break
+            if completion.__class__ is not TailCall:
+                return completion
+            function = completion.function
+            environment = completion.environment
+    except RecursionError:
+        raise ErrorAtRuntime(function.declaration.name, "Stack overflow.")
+    finally:
+        interpreter.depth -= 1
+
+
+class ClosureCompiler(Expr.Visitor, Stmt.Visitor):
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+
+    def interpret(self, statements: list[Stmt.Stmt]):
+        code = self.compile_block(statements)
+        raise_recursion_limit(self.interpreter.max_depth)
+        try:
+            for statement in code:
+                statement(self.globals)
+        except ErrorAtRuntime as e:
+            self.interpreter.runtime_error(e)
+        finally:
+            self.interpreter.depth = 0
+            self.interpreter.out.flush()
+
+    def compile(self, node: Expr.Expr | Stmt.Stmt) -> Code:
+        return node.accept(self)
+
+    def compile_block(self, statements: list[Stmt.Stmt]) -> list[Code]:
+        return [self.compile(statement) for statement in statements]
+
+    def compile_lookup(self, name: Token, expr: Expr.Expr) -> Code:
+        if expr.depth is None:
+            cell = expr.cell
+            def get_global(env):
+                value = cell.value
+                if value is UNDEFINED:
+                    raise ErrorAtRuntime(name, f"Undefined variable '{name.lexeme}'.")
+                return value
+            return get_global
+        distance, slot = expr.depth, expr.slot
+        if distance == 0:
+            return lambda env: env.values[slot]
+        if distance == 1:
+            return lambda env: env.enclosing.values[slot]
+        return lambda env: env.ancestor(distance).values[slot]
+
+    def local_slot(self, expr: Expr.Expr):
+        if isinstance(expr, Expr.Variable) and expr.depth == 0:
+            return expr.slot
+        return None
+
+    def visit_literal_expr(self, expr: Expr.Literal) -> Code:
+        value = expr.value
+        return lambda env: value
+
+    def visit_grouping_expr(self, expr: Expr.Grouping) -> Code:
+        return self.compile(expr.expression)
+
+    def visit_unary_expr(self, expr: Expr.Unary) -> Code:
+        right = self.compile(expr.right)
+        operator_token = expr.operator
+        if operator_token.type == TokenType.MINUS:
+            def negate(env):
+                value = right(env)
+                check_number_operand(operator_token, value)
+                return -value
+            return negate
+        if operator_token.type == TokenType.BANG:
+            return lambda env: not is_truthy(right(env))
+        return lambda env: None
+
+    def visit_binary_expr(self, expr: Expr.Binary) -> Code:
+        operator_token = expr.operator
+        type = operator_token.type
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        if type == TokenType.EQUAL_EQUAL:
+            return lambda env: is_equal(left(env), right(env))
+        if type == TokenType.BANG_EQUAL:
+            return lambda env: not is_equal(left(env), right(env))
+        if type == TokenType.PLUS:
+            return self.compile_plus(expr, left, right)
+        op = NUMBER_OPERATORS.get(type)
+        if op is None:
+            return lambda env: None
+
+        left_slot = self.local_slot(expr.left)
+        right_slot = self.local_slot(expr.right)
+        if left_slot is not None and isinstance(expr.right, Expr.Literal) and isinstance(expr.right.value, float):
+            constant = expr.right.value
+            def local_constant(env):
+                a = env.values[left_slot]
+                if isinstance(a, float):
+                    return op(a, constant)
+                raise ErrorAtRuntime(operator_token, "Operands must be numbers.")
+            return local_constant
+        if left_slot is not None and right_slot is not None:
+            def local_local(env):
+                values = env.values
+                a = values[left_slot]
+                b = values[right_slot]
+                if isinstance(a, float) and isinstance(b, float):
+                    return op(a, b)
+                raise ErrorAtRuntime(operator_token, "Operands must be numbers.")
+            return local_local
+
+        def binary(env):
+            a = left(env)
+            b = right(env)
+            if isinstance(a, float) and isinstance(b, float):
+                return op(a, b)
+            raise ErrorAtRuntime(operator_token, "Operands must be numbers.")
+        return binary
+
+    def compile_plus(self, expr: Expr.Binary, left: Code, right: Code) -> Code:
+        operator_token = expr.operator
+        left_slot = self.local_slot(expr.left)
+        right_slot = self.local_slot(expr.right)
+        if left_slot is not None and right_slot is not None:
+            def add_locals(env):
+                values = env.values
+                a = values[left_slot]
+                b = values[right_slot]
+                if isinstance(a, float) and isinstance(b, float) or isinstance(a, str) and isinstance(b, str):
+                    return a + b
+                raise ErrorAtRuntime(operator_token, "Operands must be two numbers or strings.")
+            return add_locals
+
+        def add(env):
+            a = left(env)
+            b = right(env)
+            if isinstance(a, float) and isinstance(b, float) or isinstance(a, str) and isinstance(b, str):
+                return a + b
+            raise ErrorAtRuntime(operator_token, "Operands must be two numbers or strings.")
+        return add
+
+    def visit_variable_expr(self, expr: Expr.Variable) -> Code:
+        return self.compile_lookup(expr.name, expr)
+
+    def visit_assign_expr(self, expr: Expr.Assign) -> Code:
+        value = self.compile(expr.value)
+        name = expr.name
+        if expr.depth is None:
+            cell = expr.cell
+            def assign_global(env):
+                result = value(env)
+                if cell.value is UNDEFINED:
+                    raise ErrorAtRuntime(name, f"Undefined variable '{name.lexeme}'.")
+                cell.value = result
+                return result
+            return assign_global
+        distance, slot = expr.depth, expr.slot
+        if distance == 0:
+            def assign_local(env):
+                result = env.values[slot] = value(env)
+                return result
+            return assign_local
+        def assign_enclosing(env):
+            result = env.ancestor(distance).values[slot] = value(env)
+            return result
+        return assign_enclosing
+
+    def visit_logical_expr(self, expr: Expr.Logical) -> Code:
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        if expr.operator.type == TokenType.OR:
+            def logical_or(env):
+                value = left(env)
+                if is_truthy(value):
+                    return value
+                return right(env)
+            return logical_or
+        def logical_and(env):
+            value = left(env)
+            if not is_truthy(value):
+                return value
+            return right(env)
+        return logical_and
+
+    def visit_call_expr(self, expr: Expr.Call) -> Code:
+        if isinstance(expr.callee, Expr.Get):
+            return self.compile_invoke(expr, expr.callee)
+        callee = self.compile(expr.callee)
+        arguments = self.compile_block(expr.arguments)
+        paren = expr.paren
+        tail = expr.tail
+        interpreter = self.interpreter
+        def call(env):
+            function = callee(env)
+            values = [argument(env) for argument in arguments]
+            if not isinstance(function, LoxCallable):
+                raise ErrorAtRuntime(paren, "Can only call functions and classes.")
+            if len(values) != function.arity():
+                raise ErrorAtRuntime(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+            if tail and function.__class__ is CompiledFunction and not function.is_initializer:
+                return TailCall(function, Environment(function.closure, values))
+            return function.call(interpreter, values)
+        return call
+
+    def compile_invoke(self, expr: Expr.Call, get: Expr.Get) -> Code:
+        object = self.compile(get.object)
+        arguments = self.compile_block(expr.arguments)
+        name = get.name
+        paren = expr.paren
+        tail = expr.tail
+        interpreter = self.interpreter
+        cache = InlineCache()
+        def invoke(env):
+            instance = object(env)
+            if not isinstance(instance, LoxInstance):
+                raise ErrorAtRuntime(name, "Only instances have properties.")
+            shape = instance.shape
+            slot, method = (cache.slot, cache.method) if cache.shape is shape else cache.lookup(shape, name)
+            if slot is not None:
+                function = instance.values[slot]
+                values = [argument(env) for argument in arguments]
+                if not isinstance(function, LoxCallable):
+                    raise ErrorAtRuntime(paren, "Can only call functions and classes.")
+                if len(values) != function.arity():
+                    raise ErrorAtRuntime(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+                if tail and function.__class__ is CompiledFunction and not function.is_initializer:
+                    return TailCall(function, Environment(function.closure, values))
+                return function.call(interpreter, values)
+            values = [argument(env) for argument in arguments]
+            if len(values) != method.arity():
+                raise ErrorAtRuntime(paren, f"Expected {method.arity()} arguments but got {len(values)}.")
+            if tail and method.__class__ is CompiledFunction and not method.is_initializer:
+                return TailCall(method, Environment(Environment(method.closure, [instance]), values))
+            return method.call_method(interpreter, instance, values)
+        return invoke
+
+    def visit_get_expr(self, expr: Expr.Get) -> Code:
+        object = self.compile(expr.object)
+        name = expr.name
+        cache = InlineCache()
+        def get(env):
+            instance = object(env)
+            if isinstance(instance, LoxInstance):
+                shape = instance.shape
+                slot, method = (cache.slot, cache.method) if cache.shape is shape else cache.lookup(shape, name)
+                if slot is not None:
+                    return instance.values[slot]
+                return method.bind(instance)
+            raise ErrorAtRuntime(name, "Only instances have properties.")
+        return get
+
+    def visit_set_expr(self, expr: Expr.Set) -> Code:
+        object = self.compile(expr.object)
+        value = self.compile(expr.value)
+        name = expr.name
+        key = name.lexeme
+        cache = StoreCache()
+        def set(env):
+            instance = object(env)
+            if not isinstance(instance, LoxInstance):
+                raise ErrorAtRuntime(name, "Only instances have fields.")
+            result = value(env)
+            shape = instance.shape
+            slot, target = (cache.slot, cache.target) if cache.shape is shape else cache.lookup(shape, key)
+            if target is shape:
+                instance.values[slot] = result
+            else:
+                instance.values.append(result)
+                instance.shape = target
+            return result
+        return set
+
+    def visit_this_expr(self, expr: Expr.This) -> Code:
+        return self.compile_lookup(expr.keyword, expr)
+
+    def visit_super_expr(self, expr: Expr.Super) -> Code:
+        distance, slot = expr.depth, expr.slot
+        keyword = expr.keyword
+        method_name = expr.method.lexeme
+        def super_method(env):
+            superclass: LoxClass = env.get_at(distance, slot)
+            instance: LoxInstance = env.get_at(distance - 1, 0)
+            method = superclass.find_method(method_name)
+            if method is None:
+                raise ErrorAtRuntime(keyword, f"Undefined property '{method_name}'.")
+            return method.bind(instance)
+        return super_method
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression) -> Code:
+        expression = self.compile(stmt.expression)
+        def expression_stmt(env):
+            expression(env)
+        return expression_stmt
+
+    def visit_print_stmt(self, stmt: Stmt.Print) -> Code:
+        expression = self.compile(stmt.expression)
+        write = self.interpreter.out.write
+        def print_stmt(env):
+            write(stringify(expression(env)) + "\n")
+        return print_stmt
+
+    def visit_var_stmt(self, stmt: Stmt.Var) -> Code:
+        name = stmt.name.lexeme
+        if stmt.initializer is None:
+            return lambda env: env.define(name, None)
+        initializer = self.compile(stmt.initializer)
+        def var_stmt(env):
+            env.define(name, initializer(env))
+        return var_stmt
+
+    def visit_block_stmt(self, stmt: Stmt.Block) -> Code:
+        statements = self.compile_block(stmt.statements)
+        def block(env):
+            environment = Environment(env)
+            for statement in statements:
+                completion = statement(environment)
+                if completion is not None:
+                    return completion
+        return block
+
+    def visit_if_stmt(self, stmt: Stmt.If) -> Code:
+        condition = self.compile(stmt.condition)
+        then_branch = self.compile(stmt.then_branch)
+        if stmt.else_branch is None:
+            def if_stmt(env):
+                if is_truthy(condition(env)):
+                    return then_branch(env)
+            return if_stmt
+        else_branch = self.compile(stmt.else_branch)
+        def if_else_stmt(env):
+            if is_truthy(condition(env)):
+                return then_branch(env)
+            return else_branch(env)
+        return if_else_stmt
+
+    def visit_while_stmt(self, stmt: Stmt.While) -> Code:
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+        def while_stmt(env):
+            while is_truthy(condition(env)):
+                completion = body(env)
+                if completion is not None:
+                    return completion
+        return while_stmt
+
+    def visit_function_stmt(self, stmt: Stmt.Function) -> Code:
+        body = self.compile_block(stmt.body)
+        name = stmt.name.lexeme
+        def function_stmt(env):
+            env.define(name, CompiledFunction(stmt, env, False, body))
+        return function_stmt
+
+    def visit_return_stmt(self, stmt: Stmt.Return) -> Code:
+        if stmt.value is None:
+            def return_nil(env):
+                return Return(None)
+            return return_nil
+        value = self.compile(stmt.value)
+        if isinstance(stmt.value, Expr.Call) and stmt.value.tail:
+            def return_call(env):
+                result = value(env)
+                if result.__class__ is TailCall:
+                    return result
+                return Return(result)
+            return return_call
+        def return_stmt(env):
+            return Return(value(env))
+        return return_stmt
+
+    def visit_class_stmt(self, stmt: Stmt.Class) -> Code:
+        name = stmt.name
+        superclass_code = self.compile(stmt.superclass) if stmt.superclass is not None else None
+        methods = [(method, self.compile_block(method.body)) for method in stmt.methods]
+        def class_stmt(env):
+            superclass = None
+            if superclass_code is not None:
+                superclass = superclass_code(env)
+                if not isinstance(superclass, LoxClass):
+                    raise ErrorAtRuntime(stmt.superclass.name, "Superclass must be a class.")
+            environment = env
+            if superclass is not None:
+                environment = Environment(env)
+                environment.define("super", superclass)
+            functions: dict[str, LoxFunction] = {}
+            for method, body in methods:
+                is_initializer = method.name.lexeme == "init"
+                functions[method.name.lexeme] = CompiledFunction(method, environment, is_initializer, body)
+            env.define(name.lexeme, LoxClass(name.lexeme, superclass, functions))
+        return class_stmt
@@ -0,0 +1,402 @@
+import lox.expr as Expr
+import lox.stmt as Stmt
+from lox.chunk import *
+from lox.error import *
+from lox.token import Token
+from lox.tokentype import TokenType
+from lox.types import FunctionType
+
+UINT8_COUNT = 256
+UINT16_MAX = 65535
+
+
+class Local:
+    def __init__(self, name: str, depth: int) -> None:
+        self.name = name
+        self.depth = depth
+        self.is_captured = False
+
+
+class FunctionState:
+    def __init__(self, enclosing, function: ObjFunction, type: FunctionType) -> None:
+        self.enclosing: FunctionState | None = enclosing
+        self.function = function
+        self.type = type
+        slot_zero = "this" if type in (FunctionType.METHOD, FunctionType.INITIALIZER) else ""
+        self.locals: list[Local] = [Local(slot_zero, 0)]
+        self.upvalues: list[tuple] = []
+        self.scope_depth = 0
+
+
+class ClassState:
+    def __init__(self, enclosing) -> None:
+        self.enclosing: ClassState | None = enclosing
+        self.has_superclass = False
+
+
+class Compiler(Expr.Visitor, Stmt.Visitor):
+    def __init__(self, error_handler: ErrorHandler) -> None:
+        self.error_handler = error_handler
+        self.state: FunctionState | None = None
+        self.class_state: ClassState | None = None
+        self.line = 1
+
+    def compile(self, statements: list[Stmt.Stmt]) -> ObjFunction:
+        self.state = FunctionState(None, ObjFunction(None), FunctionType.NONE)
+        for statement in statements:
+            self.compile_node(statement)
+        self.emit_return()
+        return self.state.function
+
+    def compile_node(self, node: Expr.Expr | Stmt.Stmt) -> None:
+        node.accept(self)
+
+    def error(self, token: Token | None, message: str) -> None:
+        if token is None:
+            self.error_handler.error_at_line(self.line, message)
+        else:
+            self.error_handler.error_at_token(token, message)
+
+    def current_chunk(self) -> Chunk:
+        return self.state.function.chunk
+
+    def emit_byte(self, byte: int) -> None:
+        self.current_chunk().write(byte, self.line)
+
+    def emit_bytes(self, *bytes: int) -> None:
+        for byte in bytes:
+            self.emit_byte(byte)
+
+    def emit_short(self, op: int, value: int) -> None:
+        self.emit_bytes(op, (value >> 8) & 0xff, value & 0xff)
+
+    def emit_return(self) -> None:
+        if self.state.type == FunctionType.INITIALIZER:
+            self.emit_bytes(OP_GET_LOCAL, 0)
+        else:
+            self.emit_byte(OP_NIL)
+        self.emit_byte(OP_RETURN)
+
+    def make_constant(self, value: object, token: Token | None = None) -> int:
+        constant = self.current_chunk().add_constant(value)
+        if constant > UINT16_MAX:
+            self.error(token, "Too many constants in one chunk.")
+            return 0
+        return constant
+
+    def emit_constant(self, value: object) -> None:
+        self.emit_short(OP_CONSTANT, self.make_constant(value))
+
+    def emit_jump(self, op: int) -> int:
+        self.emit_bytes(op, 0xff, 0xff)
+        return len(self.current_chunk().code) - 2
+
+    def patch_jump(self, offset: int, token: Token | None = None) -> None:
+        code = self.current_chunk().code
+        jump = len(code) - offset - 2
+        if jump > UINT16_MAX:
+            self.error(token, "Too much code to jump over.")
+        code[offset] = (jump >> 8) & 0xff
+        code[offset + 1] = jump & 0xff
+
+    def emit_loop(self, loop_start: int, token: Token | None = None) -> None:
+        offset = len(self.current_chunk().code) - loop_start + 3
+        if offset > UINT16_MAX:
+            self.error(token, "Loop body too large.")
+        self.emit_short(OP_LOOP, offset)
+
+    def begin_scope(self) -> None:
+        self.state.scope_depth += 1
+
+    def end_scope(self) -> None:
+        state = self.state
+        state.scope_depth -= 1
+        while len(state.locals) > 0 and state.locals[-1].depth > state.scope_depth:
+            if state.locals[-1].is_captured:
+                self.emit_byte(OP_CLOSE_UPVALUE)
+            else:
+                self.emit_byte(OP_POP)
+            state.locals.pop()
+
+    def add_local(self, name: Token) -> None:
+        if len(self.state.locals) == UINT8_COUNT:
+            self.error(name, "Too many local variables in function.")
+            return
+        self.state.locals.append(Local(name.lexeme, -1))
+
+    def mark_initialized(self) -> None:
+        if self.state.scope_depth == 0:
+            return
+        self.state.locals[-1].depth = self.state.scope_depth
+
+    def declare_variable(self, name: Token) -> None:
+        if self.state.scope_depth == 0:
+            return
+        self.add_local(name)
+
+    def define_variable(self, name: Token) -> None:
+        if self.state.scope_depth > 0:
+            self.mark_initialized()
+            return
+        self.emit_short(OP_DEFINE_GLOBAL, self.make_constant(name.lexeme, name))
+
+    def resolve_local(self, state: FunctionState, name: str) -> int:
+        for i in range(len(state.locals) - 1, -1, -1):
+            if state.locals[i].name == name:
+                return i
+        return -1
+
+    def add_upvalue(self, state: FunctionState, index: int, is_local: bool, name: Token) -> int:
+        upvalue = (index, is_local)
+        if upvalue in state.upvalues:
+            return state.upvalues.index(upvalue)
+        if len(state.upvalues) == UINT8_COUNT:
+            self.error(name, "Too many closure variables in function.")
+            return 0
+        state.upvalues.append(upvalue)
+        state.function.upvalue_count = len(state.upvalues)
+        return len(state.upvalues) - 1
+
+    def resolve_upvalue(self, state: FunctionState, name: Token) -> int:
+        if state.enclosing is None:
+            return -1
+        local = self.resolve_local(state.enclosing, name.lexeme)
+        if local != -1:
+            state.enclosing.locals[local].is_captured = True
+            return self.add_upvalue(state, local, True, name)
+        upvalue = self.resolve_upvalue(state.enclosing, name)
+        if upvalue != -1:
+            return self.add_upvalue(state, upvalue, False, name)
+        return -1
+
+    def named_variable(self, name: Token, assign: bool) -> None:
+        arg = self.resolve_local(self.state, name.lexeme)
+        self.line = name.line
+        if arg != -1:
+            self.emit_bytes(OP_SET_LOCAL if assign else OP_GET_LOCAL, arg)
+            return
+        arg = self.resolve_upvalue(self.state, name)
+        self.line = name.line
+        if arg != -1:
+            self.emit_bytes(OP_SET_UPVALUE if assign else OP_GET_UPVALUE, arg)
+            return
+        self.emit_short(OP_SET_GLOBAL if assign else OP_GET_GLOBAL, self.make_constant(name.lexeme, name))
+
+    def synthetic_token(self, token: Token, text: str) -> Token:
+        return Token(token.type, text, None, token.line)
+
+    def function(self, stmt: Stmt.Function, type: FunctionType) -> None:
+        state = FunctionState(self.state, ObjFunction(stmt.name.lexeme), type)
+        self.state = state
+        self.begin_scope()
+        state.function.arity = len(stmt.params)
+        for param in stmt.params:
+            self.declare_variable(param)
+            self.define_variable(param)
+        for statement in stmt.body:
+            self.compile_node(statement)
+        self.emit_return()
+        self.state = state.enclosing
+
+        self.line = stmt.name.line
+        self.emit_short(OP_CLOSURE, self.make_constant(state.function, stmt.name))
+        for index, is_local in state.upvalues:
+            self.emit_bytes(1 if is_local else 0, index)
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        if expr.value is None:
+            self.emit_byte(OP_NIL)
+        elif expr.value is True:
+            self.emit_byte(OP_TRUE)
+        elif expr.value is False:
+            self.emit_byte(OP_FALSE)
+        else:
+            self.emit_constant(expr.value)
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        self.compile_node(expr.expression)
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        self.compile_node(expr.right)
+        self.line = expr.operator.line
+        if expr.operator.type == TokenType.MINUS:
+            self.emit_byte(OP_NEGATE)
+        else:
+            self.emit_byte(OP_NOT)
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        self.compile_node(expr.left)
+        self.compile_node(expr.right)
+        self.line = expr.operator.line
+        self.emit_byte(BINARY_OPS[expr.operator.type])
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        self.compile_node(expr.left)
+        if expr.operator.type == TokenType.AND:
+            end_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+            self.emit_byte(OP_POP)
+            self.compile_node(expr.right)
+            self.patch_jump(end_jump, expr.operator)
+        else:
+            else_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+            end_jump = self.emit_jump(OP_JUMP)
+            self.patch_jump(else_jump, expr.operator)
+            self.emit_byte(OP_POP)
+            self.compile_node(expr.right)
+            self.patch_jump(end_jump, expr.operator)
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        self.named_variable(expr.name, False)
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        self.compile_node(expr.value)
+        self.named_variable(expr.name, True)
+
+    def visit_call_expr(self, expr: Expr.Call):
+        callee = expr.callee
+        if isinstance(callee, Expr.Get):
+            self.compile_node(callee.object)
+            self.compile_arguments(expr)
+            self.line = expr.paren.line
+            self.emit_short(OP_INVOKE, self.make_constant(callee.name.lexeme, callee.name))
+            self.emit_byte(len(expr.arguments))
+        elif isinstance(callee, Expr.Super):
+            self.named_variable(self.synthetic_token(callee.keyword, "this"), False)
+            self.compile_arguments(expr)
+            self.named_variable(self.synthetic_token(callee.keyword, "super"), False)
+            self.line = expr.paren.line
+            self.emit_short(OP_SUPER_INVOKE, self.make_constant(callee.method.lexeme, callee.method))
+            self.emit_byte(len(expr.arguments))
+        else:
+            self.compile_node(callee)
+            self.compile_arguments(expr)
+            self.line = expr.paren.line
+            self.emit_bytes(OP_CALL, len(expr.arguments))
+
+    def compile_arguments(self, expr: Expr.Call) -> None:
+        for argument in expr.arguments:
+            self.compile_node(argument)
+
+    def visit_get_expr(self, expr: Expr.Get):
+        self.compile_node(expr.object)
+        self.line = expr.name.line
+        self.emit_short(OP_GET_PROPERTY, self.make_constant(expr.name.lexeme, expr.name))
+
+    def visit_set_expr(self, expr: Expr.Set):
+        self.compile_node(expr.object)
+        self.compile_node(expr.value)
+        self.line = expr.name.line
+        self.emit_short(OP_SET_PROPERTY, self.make_constant(expr.name.lexeme, expr.name))
+
+    def visit_this_expr(self, expr: Expr.This):
+        self.named_variable(expr.keyword, False)
+
+    def visit_super_expr(self, expr: Expr.Super):
+        self.named_variable(self.synthetic_token(expr.keyword, "this"), False)
+        self.named_variable(self.synthetic_token(expr.keyword, "super"), False)
+        self.line = expr.method.line
+        self.emit_short(OP_GET_SUPER, self.make_constant(expr.method.lexeme, expr.method))
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        self.compile_node(stmt.expression)
+        self.emit_byte(OP_POP)
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        self.compile_node(stmt.expression)
+        self.emit_byte(OP_PRINT)
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        self.declare_variable(stmt.name)
+        if stmt.initializer is not None:
+            self.compile_node(stmt.initializer)
+        else:
+            self.emit_byte(OP_NIL)
+        self.line = stmt.name.line
+        self.define_variable(stmt.name)
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        self.begin_scope()
+        for statement in stmt.statements:
+            self.compile_node(statement)
+        self.end_scope()
+
+    def visit_if_stmt(self, stmt: Stmt.If):
+        self.compile_node(stmt.condition)
+        then_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit_byte(OP_POP)
+        self.compile_node(stmt.then_branch)
+        else_jump = self.emit_jump(OP_JUMP)
+        self.patch_jump(then_jump)
+        self.emit_byte(OP_POP)
+        if stmt.else_branch is not None:
+            self.compile_node(stmt.else_branch)
+        self.patch_jump(else_jump)
+
+    def visit_while_stmt(self, stmt: Stmt.While):
+        loop_start = len(self.current_chunk().code)
+        self.compile_node(stmt.condition)
+        exit_jump = self.emit_jump(OP_JUMP_IF_FALSE)
+        self.emit_byte(OP_POP)
+        self.compile_node(stmt.body)
+        self.emit_loop(loop_start)
+        self.patch_jump(exit_jump)
+        self.emit_byte(OP_POP)
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        self.declare_variable(stmt.name)
+        self.mark_initialized()
+        self.function(stmt, FunctionType.FUNCTION)
+        self.define_variable(stmt.name)
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        self.line = stmt.keyword.line
+        if stmt.value is None:
+            self.emit_return()
+        else:
+            self.compile_node(stmt.value)
+            self.emit_byte(OP_RETURN)
+
+    def visit_class_stmt(self, stmt: Stmt.Class):
+        name = stmt.name
+        self.line = name.line
+        name_constant = self.make_constant(name.lexeme, name)
+        self.declare_variable(name)
+        self.emit_short(OP_CLASS, name_constant)
+        self.define_variable(name)
+
+        class_state = ClassState(self.class_state)
+        self.class_state = class_state
+        if stmt.superclass is not None:
+            self.visit_variable_expr(stmt.superclass)
+            self.begin_scope()
+            self.add_local(self.synthetic_token(stmt.superclass.name, "super"))
+            self.define_variable(stmt.superclass.name)
+            self.named_variable(name, False)
+            self.line = stmt.superclass.name.line
+            self.emit_byte(OP_INHERIT)
+            class_state.has_superclass = True
+
+        self.named_variable(name, False)
+        for method in stmt.methods:
+            type = FunctionType.INITIALIZER if method.name.lexeme == "init" else FunctionType.METHOD
+            self.function(method, type)
+            self.emit_short(OP_METHOD, self.make_constant(method.name.lexeme, method.name))
+        self.emit_byte(OP_POP)
+
+        if class_state.has_superclass:
+            self.end_scope()
+        self.class_state = class_state.enclosing
+
+
+BINARY_OPS = {
+    TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+    TokenType.EQUAL_EQUAL: OP_EQUAL,
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+    TokenType.PLUS: OP_ADD,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.STAR: OP_MULTIPLY,
+    TokenType.SLASH: OP_DIVIDE,
+}
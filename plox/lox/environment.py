@@ -3,38 +3,65 @@ from lox.error import *
 
 
 class Environment:
-    def __init__(self, enclosing=None) -> None:
+    __slots__ = ("enclosing", "values")
+
+    def __init__(self, enclosing=None, values: list[object] | None = None) -> None:
         self.enclosing = enclosing
-        self.values = {}
+        self.values: list[object] = [] if values is None else values
 
     def define(self, name: str, value: object) -> None:
-        self.values[name] = value
+        self.values.append(value)
 
-    def assign(self, name: Token, value: object) -> None:
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
-        raise ErrorAtRuntime(name, f"Undefined variable '{name.lexeme}'.")
-    
-    def get(self, name: Token) -> object:
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
-        raise ErrorAtRuntime(name, f"Undefined variable '{name.lexeme}'.")
-    
     def ancestor(self, distance: int):
         environment = self
         for _ in range(distance):
             environment = environment.enclosing
         return environment
 
-    
-    def assign_at(self, distance: int, name: Token, value: object) -> None:
-        self.ancestor(distance).values[name.lexeme] = value
+    def assign_at(self, distance: int, slot: int, value: object) -> None:
+        self.ancestor(distance).values[slot] = value
+
+    def get_at(self, distance: int, slot: int) -> object:
+        return self.ancestor(distance).values[slot]
+
+
+UNDEFINED = object()
+
+
+class GlobalCell:
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.value: object = UNDEFINED
+
+
+class GlobalEnvironment:
+    def __init__(self) -> None:
+        self.cells: dict[str, GlobalCell] = {}
+
+    def cell(self, name: str) -> GlobalCell:
+        cell = self.cells.get(name)
+        if cell is None:
+            cell = self.cells[name] = GlobalCell(name)
+        return cell
+
+    def define(self, name: str, value: object) -> None:
+        self.cell(name).value = value
+
+    def assign(self, name: Token, value: object) -> None:
+        self.assign_cell(self.cell(name.lexeme), name, value)
+
+    def get(self, name: Token) -> object:
+        return self.get_cell(self.cell(name.lexeme), name)
+
+    def assign_cell(self, cell: GlobalCell, name: Token, value: object) -> None:
+        if cell.value is UNDEFINED:
+            raise ErrorAtRuntime(name, f"Undefined variable '{name.lexeme}'.")
+        cell.value = value
 
-    def get_at(self, distance: int, name: str) -> object:
-        return self.ancestor(distance).values[name]
\ No newline at end of file
+    def get_cell(self, cell: GlobalCell, name: Token) -> object:
+        value = cell.value
+        if value is UNDEFINED:
+            raise ErrorAtRuntime(name, f"Undefined variable '{name.lexeme}'.")
+        return value
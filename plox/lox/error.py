@@ -11,13 +11,14 @@ class ErrorAtRuntime(Exception):
         super().__init__(message)
         self.token = token
 
-class Return(Exception):
-    def __init__(self, value):
-        super().__init__()
-        self.value = value
-        
 class ErrorHandler:
-    def __init__(self):
+    def __init__(self, out=None, err=None):
+        self.out = out
+        self.err = err
+        self.had_error = False
+        self.had_runtime_error = False
+
+    def reset(self) -> None:
         self.had_error = False
         self.had_runtime_error = False
 
@@ -31,15 +32,14 @@ class ErrorHandler:
             self.report(token.line, f"at '{token.lexeme}'", message)
 
     def runtime_error(self, error: ErrorAtRuntime) -> None:
-        print(f"[line {error.token.line}] {error}")
+        print(f"[line {error.token.line}] {error}", file=self.out)
         self.had_runtime_error = True
 
     def report(self, line, where, message) -> None:
-        sys.stderr.write(
+        err = sys.stderr if self.err is None else self.err
+        err.write(
             f"[line {line}] Error {where}: {message}"
         )
-        sys.stderr.write('\n')
-        sys.stderr.flush()
-        self.had_error = True
-
-error_handler = ErrorHandler()
\ No newline at end of file
+        err.write('\n')
+        err.flush()
+        self.had_error = True
\ No newline at end of file
@@ -1,22 +1,29 @@
 from abc import ABC, abstractmethod
-from typing import List
 from lox.token import Token
 
-class Expr(ABC):
-    @abstractmethod
+class Expr:
+    __slots__ = ()
+
     def accept(self, visitor):
-        pass
+        raise NotImplementedError
 
 
 class Assign(Expr):
+    __slots__ = ("name", "value", "depth", "slot", "cell")
+
     def __init__(self, name: Token, value: Expr):
         self.name: Token = name
         self.value: Expr = value
+        self.depth: int = None
+        self.slot: int = None
+        self.cell: object = None
 
     def accept(self, visitor):
         return visitor.visit_assign_expr(self)
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left: Expr = left
         self.operator: Token = operator
@@ -26,23 +33,31 @@ class Binary(Expr):
         return visitor.visit_binary_expr(self)
 
 class Call(Expr):
-    def __init__(self, callee: Expr, paren: Token, arguments: List[Expr]):
+    __slots__ = ("callee", "paren", "arguments", "tail")
+
+    def __init__(self, callee: Expr, paren: Token, arguments: list[Expr]):
         self.callee: Expr = callee
         self.paren: Token = paren
-        self.arguments: List[Expr] = arguments
+        self.arguments: list[Expr] = arguments
+        self.tail: bool = None
 
     def accept(self, visitor):
         return visitor.visit_call_expr(self)
 
 class Get(Expr):
+    __slots__ = ("object", "name", "cache")
+
     def __init__(self, object: Expr, name: Token):
         self.object: Expr = object
         self.name: Token = name
+        self.cache: object = None
 
     def accept(self, visitor):
         return visitor.visit_get_expr(self)
 
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr):
         self.expression: Expr = expression
 
@@ -50,6 +65,8 @@ class Grouping(Expr):
         return visitor.visit_grouping_expr(self)
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: object):
         self.value: object = value
 
@@ -57,6 +74,8 @@ class Literal(Expr):
         return visitor.visit_literal_expr(self)
 
 class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left: Expr = left
         self.operator: Token = operator
@@ -66,30 +85,43 @@ class Logical(Expr):
         return visitor.visit_logical_expr(self)
 
 class Set(Expr):
+    __slots__ = ("object", "name", "value", "cache")
+
     def __init__(self, object: Expr, name: Token, value: Expr):
         self.object: Expr = object
         self.name: Token = name
         self.value: Expr = value
+        self.cache: object = None
 
     def accept(self, visitor):
         return visitor.visit_set_expr(self)
 
 class Super(Expr):
+    __slots__ = ("keyword", "method", "depth", "slot")
+
     def __init__(self, keyword: Token, method: Token):
         self.keyword: Token = keyword
         self.method: Token = method
+        self.depth: int = None
+        self.slot: int = None
 
     def accept(self, visitor):
         return visitor.visit_super_expr(self)
 
 class This(Expr):
+    __slots__ = ("keyword", "depth", "slot")
+
     def __init__(self, keyword: Token):
         self.keyword: Token = keyword
+        self.depth: int = None
+        self.slot: int = None
 
     def accept(self, visitor):
         return visitor.visit_this_expr(self)
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr):
         self.operator: Token = operator
         self.right: Expr = right
@@ -98,8 +130,13 @@ class Unary(Expr):
         return visitor.visit_unary_expr(self)
 
 class Variable(Expr):
+    __slots__ = ("name", "depth", "slot", "cell")
+
     def __init__(self, name: Token):
         self.name: Token = name
+        self.depth: int = None
+        self.slot: int = None
+        self.cell: object = None
 
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
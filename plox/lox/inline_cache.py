@@ -0,0 +1,75 @@
+from lox.token import Token
+from lox.error import ErrorAtRuntime
+
+POLYMORPHIC_LIMIT = 4
+
+
+# Property reads are keyed on the receiver's shape, which fixes both its class
+# and its field layout: a hit yields either a field slot or a method.
+class InlineCache:
+    __slots__ = ("shape", "slot", "method", "entries")
+
+    def __init__(self) -> None:
+        self.shape = None
+        self.slot: int | None = None
+        self.method = None
+        self.entries: dict[object, tuple[int | None, object]] | None = None
+
+    def lookup(self, shape, name: Token) -> tuple[int | None, object]:
+        if self.shape is shape:
+            return self.slot, self.method
+        entries = self.entries
+        if entries is not None:
+            entry = entries.get(shape)
+            if entry is not None:
+                return entry
+        slot = shape.slots.get(name.lexeme)
+        method = None
+        if slot is None:
+            method = shape.kclass.find_method(name.lexeme)
+            if method is None:
+                raise ErrorAtRuntime(name, f"Undefined property '{name.lexeme}'.")
+        if self.shape is None:
+            self.shape = shape
+            self.slot = slot
+            self.method = method
+        elif entries is None:
+            self.entries = {shape: (slot, method)}
+        elif len(entries) < POLYMORPHIC_LIMIT:
+            entries[shape] = (slot, method)
+        return slot, method
+
+
+# Property writes map the receiver's shape to the slot to store into and the
+# shape the instance has afterwards; a new field appends and transitions.
+class StoreCache:
+    __slots__ = ("shape", "slot", "target", "entries")
+
+    def __init__(self) -> None:
+        self.shape = None
+        self.slot = 0
+        self.target = None
+        self.entries: dict[object, tuple[int, object]] | None = None
+
+    def lookup(self, shape, name: str) -> tuple[int, object]:
+        if self.shape is shape:
+            return self.slot, self.target
+        entries = self.entries
+        if entries is not None:
+            entry = entries.get(shape)
+            if entry is not None:
+                return entry
+        slot = shape.slots.get(name)
+        target = shape
+        if slot is None:
+            slot = len(shape.slots)
+            target = shape.transition(name)
+        if self.shape is None:
+            self.shape = shape
+            self.slot = slot
+            self.target = target
+        elif entries is None:
+            self.entries = {shape: (slot, target)}
+        elif len(entries) < POLYMORPHIC_LIMIT:
+            entries[shape] = (slot, target)
+        return slot, target
@@ -0,0 +1,216 @@
+from collections import Counter
+
+import lox.expr as Expr
+import lox.stmt as Stmt
+from lox.error import *
+from lox.environment import Environment
+from lox.interpreter import Interpreter, Return
+from lox.loxfun import LoxFunction
+from lox.loxclass import LoxClass
+from lox.shape import Shape
+
+
+# Observer for an InstrumentedInterpreter; every hook defaults to doing nothing.
+class Instrument:
+    def interpret_started(self, statements: list[Stmt.Stmt]) -> None:
+        pass
+
+    def interpret_finished(self) -> None:
+        pass
+
+    def statement_executed(self, statement: Stmt.Stmt) -> None:
+        pass
+
+    def expression_evaluated(self, expression: Expr.Expr) -> None:
+        pass
+
+    def call_entered(self, function: LoxFunction) -> None:
+        pass
+
+    def call_exited(self, function: LoxFunction) -> None:
+        pass
+
+    def allocated(self, kind: str) -> None:
+        pass
+
+    def error_raised(self, error: ErrorAtRuntime) -> None:
+        pass
+
+
+def function_labels(statements: list[Stmt.Stmt], owner: str | None = None) -> dict[Stmt.Function, str]:
+    labels = {}
+    for statement in statements:
+        if isinstance(statement, Stmt.Function):
+            name = statement.name.lexeme if owner is None else f"{owner}.{statement.name.lexeme}"
+            labels[statement] = f"{name}:{statement.name.line}"
+            labels.update(function_labels(statement.body))
+        elif isinstance(statement, Stmt.Class):
+            labels.update(function_labels(statement.methods, statement.name.lexeme))
+        elif isinstance(statement, Stmt.Block):
+            labels.update(function_labels(statement.statements))
+        elif isinstance(statement, Stmt.If):
+            labels.update(function_labels([statement.then_branch]))
+            if statement.else_branch is not None:
+                labels.update(function_labels([statement.else_branch]))
+        elif isinstance(statement, Stmt.While):
+            labels.update(function_labels([statement.body]))
+    return labels
+
+
+def function_label(labels: dict[Stmt.Function, str], function: LoxFunction) -> str:
+    declaration = function.declaration
+    label = labels.get(declaration)
+    if label is None:
+        label = f"{declaration.name.lexeme}:{declaration.name.line}"
+    return label
+
+
+class InstrumentedFunction(LoxFunction):
+    def call(self, interpreter, arguments: list[object]) -> object:
+        interpreter.allocated("Environment")
+        interpreter.call_entered(self)
+        try:
+            return super().call(interpreter, arguments)
+        finally:
+            interpreter.call_exited(self)
+
+    def call_method(self, interpreter, instance, arguments: list[object]) -> object:
+        interpreter.allocated("Environment")
+        interpreter.allocated("Environment")
+        interpreter.call_entered(self)
+        try:
+            return super().call_method(interpreter, instance, arguments)
+        finally:
+            interpreter.call_exited(self)
+
+
+class InstrumentedClass(LoxClass):
+    def call(self, interpreter, arguments: list[object]) -> object:
+        interpreter.allocated("LoxInstance")
+        return super().call(interpreter, arguments)
+
+
+# The plain Interpreter never checks whether anyone is listening; programs run
+# with instruments attached go through this subclass and its function and class
+# types instead, so the hooks cost nothing when they are not used.
+class InstrumentedInterpreter(Interpreter):
+    function_type = InstrumentedFunction
+    class_type = InstrumentedClass
+
+    def __init__(self, instruments: list[Instrument], error_handler: ErrorHandler | None = None, out=None, max_depth: int | None = None) -> None:
+        super().__init__(error_handler, out, max_depth)
+        self.instruments = instruments
+        self.property: tuple[int | None, LoxFunction] = (None, None)
+
+    def interpret(self, statements: list[Stmt.Stmt]):
+        for instrument in self.instruments:
+            instrument.interpret_started(statements)
+        try:
+            super().interpret(statements)
+        finally:
+            for instrument in self.instruments:
+                instrument.interpret_finished()
+
+    def runtime_error(self, error: ErrorAtRuntime) -> None:
+        for instrument in self.instruments:
+            instrument.error_raised(error)
+        super().runtime_error(error)
+
+    def evaluate(self, expression: Expr.Expr) -> object:
+        for instrument in self.instruments:
+            instrument.expression_evaluated(expression)
+        return expression.accept(self)
+
+    def execute(self, statement: Stmt.Stmt) -> Return | None:
+        for instrument in self.instruments:
+            instrument.statement_executed(statement)
+        return statement.accept(self)
+
+    def execute_block(self, statements: list[Stmt.Stmt], environment: Environment) -> Return | None:
+        previous = self.environment
+        try:
+            self.environment = environment
+            for statement in statements:
+                completion = self.execute(statement)
+                if completion is not None:
+                    return completion
+            return None
+        finally:
+            self.environment = previous
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        self.allocated("Environment")
+        return super().visit_block_stmt(stmt)
+
+    def find_property(self, get: Expr.Get, shape: Shape) -> tuple[int | None, LoxFunction]:
+        self.property = super().find_property(get, shape)
+        return self.property
+
+    # The receiver is evaluated before its property is looked up, so once
+    # visit_get_expr returns, self.property is this expression's lookup and a
+    # method there means a bound method was made.
+    def visit_get_expr(self, expr: Expr.Get):
+        value = super().visit_get_expr(expr)
+        if self.property[1] is not None:
+            self.allocated("Environment")
+        return value
+
+    def visit_super_expr(self, expr: Expr.Super):
+        method = super().visit_super_expr(expr)
+        self.allocated("Environment")
+        return method
+
+    def visit_class_stmt(self, stmt: Stmt.Class):
+        if stmt.superclass is not None:
+            self.allocated("Environment")
+        return super().visit_class_stmt(stmt)
+
+    def call_entered(self, function: LoxFunction) -> None:
+        for instrument in self.instruments:
+            instrument.call_entered(function)
+
+    def call_exited(self, function: LoxFunction) -> None:
+        for instrument in self.instruments:
+            instrument.call_exited(function)
+
+    def allocated(self, kind: str) -> None:
+        for instrument in self.instruments:
+            instrument.allocated(kind)
+
+
+class Statistics(Instrument):
+    def __init__(self) -> None:
+        self.labels: dict[Stmt.Function, str] = {}
+        self.statements: Counter = Counter()
+        self.expressions: Counter = Counter()
+        self.calls: Counter = Counter()
+        self.allocations: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def interpret_started(self, statements: list[Stmt.Stmt]) -> None:
+        self.labels.update(function_labels(statements))
+
+    def statement_executed(self, statement: Stmt.Stmt) -> None:
+        self.statements[statement.__class__.__name__] += 1
+
+    def expression_evaluated(self, expression: Expr.Expr) -> None:
+        self.expressions[expression.__class__.__name__] += 1
+
+    def call_entered(self, function: LoxFunction) -> None:
+        label = function_label(self.labels, function)
+        self.calls[label] += 1
+
+    def allocated(self, kind: str) -> None:
+        self.allocations[kind] += 1
+
+    def error_raised(self, error: ErrorAtRuntime) -> None:
+        self.errors[str(error)] += 1
+
+    def report(self, out) -> None:
+        out.write("Lox statistics\n")
+        for title, counter in (("statement", self.statements), ("expression", self.expressions),
+                               ("call", self.calls), ("allocation", self.allocations),
+                               ("runtime error", self.errors)):
+            out.write(f"\n{sum(counter.values()):>10}  {title}s\n")
+            for name, count in sorted(counter.items(), key=lambda item: (-item[1], item[0])):
+                out.write(f"{count:>10}    {name}\n")
@@ -1,18 +1,58 @@
-from typing import List, Dict
+import operator
+import sys
 
 import lox.expr as Expr
 import lox.stmt as Stmt
 from lox.error import *
 from lox.tokentype import TokenType
 from lox.token import Token
-from lox.environment import Environment
+from lox.environment import Environment, GlobalEnvironment, UNDEFINED
 from lox.lib import Clock
 from lox.callable import LoxCallable
 from lox.loxfun import LoxFunction
 from lox.loxinstance import LoxInstance
 from lox.loxclass import LoxClass
+from lox.shape import Shape
+from lox.inline_cache import InlineCache, StoreCache
+from lox.output import BufferedOutput
 
 
+NUMBER_OPERATORS = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.BANG_EQUAL: operator.ne,
+    TokenType.EQUAL_EQUAL: operator.eq,
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.SLASH: operator.truediv,
+}
+
+MAX_CALL_DEPTH = 1024
+# Python frames allowed per Lox call. Bodies nested deeply enough to use more
+# run out of Python stack first, which is reported as a stack overflow too.
+# The limit is process-wide and only ever raised, so interpreters running in
+# other threads never see it drop underneath them.
+FRAMES_PER_CALL = 40
+
+
+class Return:
+    __slots__ = ("value",)
+
+    def __init__(self, value: object) -> None:
+        self.value = value
+
+# Completion of `return f(...)`: the caller's trampoline runs the body in
+# place of the returning function instead of nesting another Python call.
+class TailCall:
+    __slots__ = ("function", "environment")
+
+    def __init__(self, function: LoxFunction, environment: Environment) -> None:
+        self.function = function
+        self.environment = environment
+
 def is_truthy(value: object):
     if value is None:
         return False
@@ -37,6 +77,25 @@ def stringify(value: object) -> str:
         return text
     return str(value)
 
+def raise_recursion_limit(max_depth: int) -> None:
+    limit = max_depth * FRAMES_PER_CALL
+    if sys.getrecursionlimit() < limit:
+        sys.setrecursionlimit(limit)
+
+# Everything visit_binary_expr's number-number fast path does not handle.
+def binary(operator: Token, left: object, right: object) -> object:
+    type = operator.type
+    if type == TokenType.EQUAL_EQUAL:
+        return is_equal(left, right)
+    if type == TokenType.BANG_EQUAL:
+        return not is_equal(left, right)
+    if type == TokenType.PLUS:
+        if isinstance(left, str) and isinstance(right, str):
+            return left + right
+        raise ErrorAtRuntime(operator, "Operands must be two numbers or strings.")
+    check_number_operands(operator, left, right)
+    return NUMBER_OPERATORS[type](left, right)
+
 def check_number_operand(operator: Token, operand: object):
     if isinstance(operand, float):
         return
@@ -48,21 +107,34 @@ def check_number_operands(operator: Token, left: object, right: object):
     raise ErrorAtRuntime(operator, "Operands must be numbers.")
 
 class Interpreter(Expr.Visitor, Stmt.Visitor):
-    def __init__(self):
-        self.globals = Environment()
+    function_type = LoxFunction
+    class_type = LoxClass
+
+    def __init__(self, error_handler: ErrorHandler | None = None, out=None, max_depth: int | None = None):
+        self.out = BufferedOutput() if out is None else out
+        self.error_handler = ErrorHandler(self.out) if error_handler is None else error_handler
+        self.max_depth = MAX_CALL_DEPTH if max_depth is None else max_depth
+        self.depth = 0
+        self.globals = GlobalEnvironment()
         self.environment = self.globals
-        self.locals: Dict[Expr.Expr, int] = {}
         self.globals.define(
             "clock",
             Clock()
         )
 
-    def interpret(self, statements: List[Stmt.Stmt]):
+    def interpret(self, statements: list[Stmt.Stmt]):
+        raise_recursion_limit(self.max_depth)
         try:
             for statement in statements:
                 self.execute(statement) 
         except ErrorAtRuntime as e:
-            error_handler.runtime_error(e)
+            self.runtime_error(e)
+        finally:
+            self.depth = 0
+            self.out.flush()
+
+    def runtime_error(self, error: ErrorAtRuntime) -> None:
+        self.error_handler.runtime_error(error)
 
     def visit_literal_expr(self, expr: Expr.Literal):
         return expr.value
@@ -73,7 +145,10 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
     def visit_unary_expr(self, expr: Expr.Unary):
         value = self.evaluate(expr.right)
         if expr.operator.type == TokenType.MINUS:
-            return -float(value)
+            if value.__class__ is float:
+                return -value
+            check_number_operand(expr.operator, value)
+            return -value
         elif expr.operator.type == TokenType.BANG:
             return not is_truthy(value)
         
@@ -82,51 +157,19 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
     def visit_binary_expr(self, expr: Expr.Binary):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
-        match expr.operator.type:
-            case TokenType.GREATER:
-                check_number_operands(expr.operator, left, right)
-                return float(left) > float(right)
-            case TokenType.GREATER_EQUAL:
-                check_number_operands(expr.operator, left, right)
-                return float(left) >= float(right)
-            case TokenType.LESS:
-                check_number_operands(expr.operator, left, right)
-                return float(left) < float(right)
-            case TokenType.LESS_EQUAL:
-                check_number_operands(expr.operator, left, right)
-                return float(left) <= float(right)
-            case TokenType.BANG_EQUAL:
-                return not is_equal(left, right)
-            case TokenType.EQUAL_EQUAL:
-                return is_equal(left, right)
-            case TokenType.PLUS:
-                if isinstance(left, float) and isinstance(right, float):
-                    return float(left) + float(right)
-                if isinstance(left, str) and isinstance(right, str):
-                    return str(left) + str(right)
-                raise ErrorAtRuntime(expr.operator, "Operands must be two numbers or strings.")
-            case TokenType.MINUS:
-                check_number_operands(expr.operator, left, right)
-                return float(left) - float(right)
-            case TokenType.STAR:
-                check_number_operands(expr.operator, left, right)
-                return float(left) * float(right)
-            case TokenType.SLASH:
-                check_number_operands(expr.operator, left, right)
-                return float(left) / float(right)
-            case _:
-                return None
+        if left.__class__ is float and right.__class__ is float:
+            return NUMBER_OPERATORS[expr.operator.type](left, right)
+        return binary(expr.operator, left, right)
             
     def visit_variable_expr(self, expr: Expr.Variable):
         return self.look_up_variable(expr.name, expr)
     
     def visit_assign_expr(self, expr: Expr.Assign):
         value = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
+        if expr.depth is not None:
+            self.environment.assign_at(expr.depth, expr.slot, value)
         else:
-            self.globals.assign(expr.name, value)
+            self.globals.assign_cell(expr.cell, expr.name, value)
         return value
     
     def visit_logical_expr(self, expr: Expr.Logical):
@@ -140,6 +183,8 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         return self.evaluate(expr.right)
     
     def visit_call_expr(self, expr: Expr.Call):
+        if expr.callee.__class__ is Expr.Get:
+            return self.invoke(expr, expr.callee)
         callee = self.evaluate(expr.callee)
         arguments = []
         for argument in expr.arguments:
@@ -149,13 +194,49 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         function: LoxCallable = callee
         if len(arguments) != function.arity():
             raise ErrorAtRuntime(expr.paren, f"Expected {function.arity()} arguments but got {len(arguments)}.")
+        if expr.tail and function.__class__ is LoxFunction and not function.is_initializer:
+            return TailCall(function, Environment(function.closure, arguments))
         return function.call(self, arguments)
-    
+
+    def invoke(self, expr: Expr.Call, get: Expr.Get):
+        object = self.evaluate(get.object)
+        if not isinstance(object, LoxInstance):
+            raise ErrorAtRuntime(get.name, "Only instances have properties.")
+        instance: LoxInstance = object
+        slot, method = self.find_property(get, instance.shape)
+        if slot is not None:
+            callee = instance.values[slot]
+            arguments = [self.evaluate(argument) for argument in expr.arguments]
+            if not isinstance(callee, LoxCallable):
+                raise ErrorAtRuntime(expr.paren, "Can only call functions and classes.")
+            if len(arguments) != callee.arity():
+                raise ErrorAtRuntime(expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+            if expr.tail and callee.__class__ is LoxFunction and not callee.is_initializer:
+                return TailCall(callee, Environment(callee.closure, arguments))
+            return callee.call(self, arguments)
+        arguments = [self.evaluate(argument) for argument in expr.arguments]
+        if len(arguments) != method.arity():
+            raise ErrorAtRuntime(expr.paren, f"Expected {method.arity()} arguments but got {len(arguments)}.")
+        if expr.tail and method.__class__ is LoxFunction and not method.is_initializer:
+            return TailCall(method, Environment(Environment(method.closure, [instance]), arguments))
+        return method.call_method(self, instance, arguments)
+
+    def find_property(self, get: Expr.Get, shape: Shape) -> tuple[int | None, LoxFunction]:
+        cache = get.cache
+        if cache is None:
+            cache = get.cache = InlineCache()
+        if cache.shape is shape:
+            return cache.slot, cache.method
+        return cache.lookup(shape, get.name)
+
     def visit_get_expr(self, expr: Expr.Get):
         object = self.evaluate(expr.object)
         if isinstance(object, LoxInstance):
             instance: LoxInstance = object
-            return instance.get(expr.name)
+            slot, method = self.find_property(expr, instance.shape)
+            if slot is not None:
+                return instance.values[slot]
+            return method.bind(instance)
         raise ErrorAtRuntime(expr.name, "Only instances have properties.")
     
     def visit_set_expr(self, expr: Expr.Set):
@@ -164,15 +245,27 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
             raise ErrorAtRuntime(expr.name, "Only instances have fields.")
         value = self.evaluate(expr.value)
         instance: LoxInstance = object
-        instance.set(expr.name, value)
+        cache = expr.cache
+        if cache is None:
+            cache = expr.cache = StoreCache()
+        shape = instance.shape
+        if cache.shape is shape:
+            slot, target = cache.slot, cache.target
+        else:
+            slot, target = cache.lookup(shape, expr.name.lexeme)
+        if target is shape:
+            instance.values[slot] = value
+        else:
+            instance.values.append(value)
+            instance.shape = target
+        return value
 
     def visit_this_expr(self, expr: Expr.This):
         return self.look_up_variable(expr.keyword, expr)
     
     def visit_super_expr(self, expr: Expr.Super):
-        distance = self.locals.get(expr)
-        superclass: LoxClass = self.environment.get_at(distance, "super")
-        object: LoxInstance = self.environment.get_at(distance-1, "this")
+        superclass: LoxClass = self.environment.get_at(expr.depth, expr.slot)
+        object: LoxInstance = self.environment.get_at(expr.depth-1, 0)
         method = superclass.find_method(expr.method.lexeme)
         if method is None:
             raise ErrorAtRuntime(expr.keyword, f"Undefined property '{expr.method.lexeme}'.")
@@ -184,7 +277,7 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
     
     def visit_print_stmt(self, stmt: Stmt.Print):
         value = self.evaluate(stmt.expression)
-        print(stringify(value))
+        self.out.write(stringify(value) + "\n")
 
     def visit_var_stmt(self, stmt: Stmt.Var):
         value = None
@@ -193,22 +286,24 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         self.environment.define(stmt.name.lexeme, value)
 
     def visit_block_stmt(self, stmt: Stmt.Block):
-        self.execute_block(stmt.statements, Environment(self.environment))  
+        return self.execute_block(stmt.statements, Environment(self.environment))
 
     def visit_if_stmt(self, stmt: Stmt.If) -> None:
         if is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
+            return self.execute(stmt.then_branch)
         elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.else_branch)
         return None
     
     def visit_while_stmt(self, stmt: Stmt.While):
         while is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            completion = self.execute(stmt.body)
+            if completion is not None:
+                return completion
         return None
     
     def visit_function_stmt(self, stmt: Stmt.Function):
-        function = LoxFunction(stmt, self.environment, False)
+        function = self.function_type(stmt, self.environment, False)
         self.environment.define(stmt.name.lexeme, function)
         return None
     
@@ -216,52 +311,73 @@ class Interpreter(Expr.Visitor, Stmt.Visitor):
         value = None
         if stmt.value is not None:
             value = self.evaluate(stmt.value)
-        raise Return(value)
+            if value.__class__ is TailCall:
+                return value
+        return Return(value)
     
     def visit_class_stmt(self, stmt: Stmt.Class):
         superclass = None
         if stmt.superclass is not None:
             superclass = self.evaluate(stmt.superclass)
             if not isinstance(superclass, LoxClass):
-                raise ErrorAtRuntime(stmt.superclass, "Superclass must be a class.")
-        self.environment.define(stmt.name.lexeme, None)
+                raise ErrorAtRuntime(stmt.superclass.name, "Superclass must be a class.")
         if stmt.superclass is not None:
             self.environment = Environment(self.environment)
             self.environment.define("super", superclass)
-        methods: Dict[str, LoxFunction] = {}
+        methods: dict[str, LoxFunction] = {}
         for method in stmt.methods:
-            function = LoxFunction(method, self.environment, method.name.lexeme == "init")
+            function = self.function_type(method, self.environment, method.name.lexeme == "init")
             methods[method.name.lexeme] = function
-        kclass = LoxClass(stmt.name.lexeme, superclass, methods)
+        kclass = self.class_type(stmt.name.lexeme, superclass, methods)
         if superclass is not None:
             self.environment = self.environment.enclosing
-        self.environment.assign(stmt.name, kclass)
+        self.environment.define(stmt.name.lexeme, kclass)
         return None
 
 
     def evaluate(self, expression: Expr.Expr) -> object:
         return expression.accept(self)
     
-    def execute(self, statement: Stmt.Stmt) -> None:
-        statement.accept(self)
+    def execute(self, statement: Stmt.Stmt) -> Return | None:
+        return statement.accept(self)
 
-    def execute_block(self, statements: List[Stmt.Stmt], environment: Environment):
+    def execute_block(self, statements: list[Stmt.Stmt], environment: Environment) -> Return | None:
         previous = self.environment
         try:
             self.environment = environment
-            for statement in statements: 
-                self.execute(statement)
+            for statement in statements:
+                completion = statement.accept(self)
+                if completion is not None:
+                    return completion
+            return None
         finally:
             self.environment = previous
 
-    def resolve(self, expr: Expr.Expr, depth: int):
-        self.locals[expr] = depth
+    def execute_call(self, declaration: Stmt.Function, environment: Environment) -> Return | None:
+        if self.depth == self.max_depth:
+            raise ErrorAtRuntime(declaration.name, "Stack overflow.")
+        self.depth += 1
+        try:
+            completion = self.execute_block(declaration.body, environment)
+            while completion.__class__ is TailCall:
+                completion = self.execute_block(completion.function.declaration.body, completion.environment)
+            return completion
+        except RecursionError:
+            raise ErrorAtRuntime(declaration.name, "Stack overflow.")
+        finally:
+            self.depth -= 1
+
+    def resolve(self, expr: Expr.Expr, depth: int, slot: int):
+        expr.depth = depth
+        expr.slot = slot
+
+    def resolve_global(self, expr: Expr.Expr, name: Token):
+        expr.cell = self.globals.cell(name.lexeme)
 
     def look_up_variable(self, name: Token, expr: Expr.Expr):
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
-        else:
-            return self.globals.get(name)
-    
-interpreter = Interpreter()
\ No newline at end of file
+        if expr.depth is not None:
+            return self.environment.get_at(expr.depth, expr.slot)
+        value = expr.cell.value
+        if value is UNDEFINED:
+            raise ErrorAtRuntime(name, f"Undefined variable '{name.lexeme}'.")
+        return value
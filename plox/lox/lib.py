@@ -1,4 +1,3 @@
-from typing import List
 import time
 
 from lox.callable import LoxCallable
@@ -6,7 +5,7 @@ from lox.callable import LoxCallable
 class Clock(LoxCallable):
     def arity(self) -> int:
         return 0
-    def call(self, interpreter, arguments: List[object]) -> object:
+    def call(self, interpreter, arguments: list[object]) -> object:
         return time.time()
     
     def __repr__(self) -> str:
@@ -1,34 +1,32 @@
-from typing import Dict, List
-
 from lox.callable import LoxCallable
 from lox.loxfun import LoxFunction
 from lox.loxinstance import LoxInstance
+from lox.shape import Shape
 
 class LoxClass(LoxCallable):
-    def __init__(self, name: str, superclass, methods: Dict[str, LoxFunction]) -> None:
+    def __init__(self, name: str, superclass, methods: dict[str, LoxFunction]) -> None:
         self.name = name
-        self.methods = methods
         self.superclass = superclass
+        self.methods: dict[str, LoxFunction] = {}
+        if superclass is not None:
+            self.methods.update(superclass.methods)
+        self.methods.update(methods)
+        self.initializer: LoxFunction = self.methods.get("init")
+        self.shape = Shape(self)
 
     def __repr__(self) -> str:
         return self.name
     
     def arity(self) -> int:
-        initializer = self.find_method("init")
-        if initializer is None:
+        if self.initializer is None:
             return 0
-        return initializer.arity()
+        return self.initializer.arity()
     
-    def call(self, interpreter, arguments: List[object]) -> object:
+    def call(self, interpreter, arguments: list[object]) -> object:
         instance = LoxInstance(self)
-        initializer = self.find_method("init")
-        if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+        if self.initializer is not None:
+            self.initializer.call_method(interpreter, instance, arguments)
         return instance
     
     def find_method(self, name: str) -> LoxFunction:
-        if name in self.methods:
-            return self.methods[name]
-        elif self.superclass is not None:
-            return self.superclass.find_method(name)
-        return None
\ No newline at end of file
+        return self.methods.get(name)
\ No newline at end of file
@@ -1,4 +1,3 @@
-from typing import List
 from lox.callable import LoxCallable
 
 import lox.stmt as Stmt
@@ -11,18 +10,22 @@ class LoxFunction(LoxCallable):
         self.closure: Environment = closure
         self.is_initializer: bool = is_initializer
 
-    def call(self, interpreter, arguments: List[object]) -> object:
-        environment = Environment(self.closure)
-        for i, param in enumerate(self.declaration.params):
-            environment.define(param.lexeme, arguments[i])
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as return_stmt:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return return_stmt.value
+    def call(self, interpreter, arguments: list[object]) -> object:
+        environment = Environment(self.closure, list(arguments))
+        completion = interpreter.execute_call(self.declaration, environment)
+        if self.is_initializer:
+            return self.closure.get_at(0, 0)
+        if completion is not None:
+            return completion.value
+        return None
+
+    def call_method(self, interpreter, instance, arguments: list[object]) -> object:
+        this = Environment(self.closure, [instance])
+        completion = interpreter.execute_call(self.declaration, Environment(this, list(arguments)))
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            return instance
+        if completion is not None:
+            return completion.value
         return None
 
     def arity(self) -> int:
@@ -31,7 +34,7 @@ class LoxFunction(LoxCallable):
     def bind(self, instance):
         environment = Environment(self.closure)
         environment.define("this", instance)
-        return LoxFunction(self.declaration, environment, self.is_initializer)
+        return self.__class__(self.declaration, environment, self.is_initializer)
     
     def __repr__(self) -> str:
         return f"<fn: {self.declaration.name.lexeme}>"
@@ -1,26 +1,33 @@
-from typing import Dict
-
 from lox.token import Token
 from lox.loxfun import LoxFunction
 from lox.error import ErrorAtRuntime
 
 class LoxInstance:
+    __slots__ = ("kclass", "shape", "values")
+
     def __init__(self, kclass):
         self.kclass = kclass
-        self.fields: Dict[str, object] = {}
+        self.shape = kclass.shape
+        self.values: list[object] = []
         
     def __repr__(self) -> str:
         return self.kclass.name + " instancce"
     
     
     def get(self, name: Token):
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is not None:
+            return self.values[slot]
         method: LoxFunction = self.kclass.find_method(name.lexeme)
         if method is not None:
             return method.bind(self)
         raise ErrorAtRuntime(name, f"Undefined property '{name.lexeme}'.")
     
     def set(self, name: Token, value: object):
-        self.fields[name.lexeme] = value
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is not None:
+            self.values[slot] = value
+        else:
+            self.shape = self.shape.transition(name.lexeme)
+            self.values.append(value)
     
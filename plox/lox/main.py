@@ -1,55 +1,95 @@
-import sys
 import os
+import sys
 
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-
-from lox.scanner import Scanner
-from lox.parser import Parser
+# Run as lox/main.py the package is not on the path yet; the plox script and
+# python -m lox import this module and skip this.
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lox.error import *
-from lox.interpreter import interpreter
-from lox.resolver import Resolver
+from lox.runtime import LoxRuntime
 
+backends = {
+    "--closure": "closure",
+    "--vm": "vm",
+}
 
 def main():
-    if len(sys.argv) > 2:
-        print("Usage: plox [script]")
-        sys.exit(64)
-    elif len(sys.argv) == 2:
-        run_file(sys.argv[1])
+    args = sys.argv[1:]
+    if len(args) > 0 and args[0] == "batch":
+        from lox.batch import main as batch
+        return batch(args[1:])
+    if len(args) > 0 and args[0] == "serve":
+        from lox.server import main as serve
+        return serve(args[1:])
+    backend = "interpreter"
+    optimize = False
+    # __loxcache__ holds pickled programs that are loaded as trusted code;
+    # only files owned by this user and writable by no one else are used.
+    use_cache = True
+    profiler = None
+    statistics = None
+    max_depth = None
+    command = None
+    while len(args) > 0 and args[0].startswith("-"):
+        flag = args.pop(0)
+        if flag in backends:
+            backend = backends[flag]
+        elif flag in ("-O", "--optimize"):
+            optimize = True
+        elif flag == "--no-cache":
+            use_cache = False
+        elif flag == "--profile":
+            from lox.profiler import Profiler
+            profiler = Profiler()
+        elif flag == "--stats":
+            from lox.instrumentation import Statistics
+            statistics = Statistics()
+        elif flag == "--max-depth" and len(args) > 0 and args[0].isdigit() and int(args[0]) > 0:
+            max_depth = int(args.pop(0))
+        elif flag == "-c" and len(args) > 0:
+            command = args.pop(0)
+            break
+        else:
+            usage()
+    instruments = [instrument for instrument in (profiler, statistics) if instrument is not None]
+    if len(args) > 1 or command is not None and len(args) > 0 or instruments and backend != "interpreter":
+        usage()
+    runtime = LoxRuntime(backend, optimize, use_cache, max_depth, instruments)
+    if command is not None:
+        runtime.run(command)
+        finish(runtime, "plox", profiler, statistics)
+    elif len(args) == 1:
+        runtime.run_file(args[0])
+        finish(runtime, args[0], profiler, statistics)
     else:
-        run_prompt()
+        run_prompt(runtime)
 
-def run_file(filename):
-    with open(filename, 'r', encoding='utf-8') as f:
-        run(f.read())
-    if error_handler.had_error:
-        sys.exit(65)
-    if error_handler.had_runtime_error:
-        sys.exit(70)
+def usage():
+    print("Usage: plox [--closure | --vm | --profile | --stats] [-O] [--no-cache] [--max-depth n] [-c command | script]")
+    sys.exit(64)
 
-def run_prompt():
+def finish(runtime, name, profiler, statistics):
+    if profiler is not None:
+        write_profile(profiler, name)
+    if statistics is not None:
+        statistics.report(sys.stderr)
+    if runtime.status != 0:
+        sys.exit(runtime.status)
+
+def write_profile(profiler, name):
+    path = os.path.basename(name) + ".collapsed"
+    profiler.report(sys.stderr)
+    profiler.write_collapsed(path)
+    sys.stderr.write(f"\nCollapsed stacks written to {path}\n")
+
+def run_prompt(runtime):
     while True:
         line = input("> ")
         if line == '':
             break
-        run(line)
-        error_handler.had_error = False
-
-
-def run(source):
-    scanner = Scanner(source)
-    tokens = scanner.scan_tokens()
-    parser = Parser(tokens)
-    statements = parser.parse()
-    if error_handler.had_error:
-        return
-    resolver = Resolver(interpreter)
-    resolver.resolve(statements)
-    if error_handler.had_error:
-        return
-    interpreter.interpret(statements)
+        runtime.run(line)
+        runtime.reset()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
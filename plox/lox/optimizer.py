@@ -0,0 +1,157 @@
+import lox.expr as Expr
+import lox.stmt as Stmt
+from lox.tokentype import TokenType
+from lox.interpreter import is_truthy, is_equal, NUMBER_OPERATORS
+
+
+# Rewrites nodes in place so the ones the Resolver recorded keep their identity.
+# Anything that could raise at runtime is left alone to report at execution time.
+class Optimizer(Expr.Visitor, Stmt.Visitor):
+    def optimize(self, statements: list[Stmt.Stmt]) -> list[Stmt.Stmt]:
+        return self.optimize_block(statements)
+
+    def optimize_block(self, statements: list[Stmt.Stmt]) -> list[Stmt.Stmt]:
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if statement is not None:
+                optimized.append(statement)
+        return optimized
+
+    def optimize_branch(self, statement: Stmt.Stmt) -> Stmt.Stmt:
+        optimized = statement.accept(self)
+        if optimized is None:
+            return Stmt.Block([])
+        return optimized
+
+    def fold(self, expr: Expr.Expr) -> Expr.Expr:
+        return expr.accept(self)
+
+    def visit_literal_expr(self, expr: Expr.Literal):
+        return expr
+
+    def visit_grouping_expr(self, expr: Expr.Grouping):
+        return self.fold(expr.expression)
+
+    def visit_unary_expr(self, expr: Expr.Unary):
+        expr.right = self.fold(expr.right)
+        if not isinstance(expr.right, Expr.Literal):
+            return expr
+        value = expr.right.value
+        if expr.operator.type == TokenType.BANG:
+            return Expr.Literal(not is_truthy(value))
+        if expr.operator.type == TokenType.MINUS and isinstance(value, float):
+            return Expr.Literal(-value)
+        return expr
+
+    def visit_binary_expr(self, expr: Expr.Binary):
+        expr.left = self.fold(expr.left)
+        expr.right = self.fold(expr.right)
+        if not isinstance(expr.left, Expr.Literal) or not isinstance(expr.right, Expr.Literal):
+            return expr
+        left = expr.left.value
+        right = expr.right.value
+        type = expr.operator.type
+        if type == TokenType.EQUAL_EQUAL:
+            return Expr.Literal(is_equal(left, right))
+        if type == TokenType.BANG_EQUAL:
+            return Expr.Literal(not is_equal(left, right))
+        if type == TokenType.PLUS:
+            if isinstance(left, float) and isinstance(right, float) or isinstance(left, str) and isinstance(right, str):
+                return Expr.Literal(left + right)
+            return expr
+        if not isinstance(left, float) or not isinstance(right, float):
+            return expr
+        if type == TokenType.SLASH and right == 0:
+            return expr
+        return Expr.Literal(NUMBER_OPERATORS[type](left, right))
+
+    def visit_logical_expr(self, expr: Expr.Logical):
+        expr.left = self.fold(expr.left)
+        expr.right = self.fold(expr.right)
+        if not isinstance(expr.left, Expr.Literal):
+            return expr
+        if expr.operator.type == TokenType.OR:
+            if is_truthy(expr.left.value):
+                return expr.left
+        elif not is_truthy(expr.left.value):
+            return expr.left
+        return expr.right
+
+    def visit_variable_expr(self, expr: Expr.Variable):
+        return expr
+
+    def visit_assign_expr(self, expr: Expr.Assign):
+        expr.value = self.fold(expr.value)
+        return expr
+
+    def visit_call_expr(self, expr: Expr.Call):
+        expr.callee = self.fold(expr.callee)
+        expr.arguments = [self.fold(argument) for argument in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr: Expr.Get):
+        expr.object = self.fold(expr.object)
+        return expr
+
+    def visit_set_expr(self, expr: Expr.Set):
+        expr.object = self.fold(expr.object)
+        expr.value = self.fold(expr.value)
+        return expr
+
+    def visit_this_expr(self, expr: Expr.This):
+        return expr
+
+    def visit_super_expr(self, expr: Expr.Super):
+        return expr
+
+    def visit_expression_stmt(self, stmt: Stmt.Expression):
+        stmt.expression = self.fold(stmt.expression)
+        return stmt
+
+    def visit_print_stmt(self, stmt: Stmt.Print):
+        stmt.expression = self.fold(stmt.expression)
+        return stmt
+
+    def visit_var_stmt(self, stmt: Stmt.Var):
+        if stmt.initializer is not None:
+            stmt.initializer = self.fold(stmt.initializer)
+        return stmt
+
+    def visit_block_stmt(self, stmt: Stmt.Block):
+        stmt.statements = self.optimize_block(stmt.statements)
+        return stmt
+
+    def visit_if_stmt(self, stmt: Stmt.If) -> Stmt.Stmt | None:
+        stmt.condition = self.fold(stmt.condition)
+        if isinstance(stmt.condition, Expr.Literal):
+            if is_truthy(stmt.condition.value):
+                return stmt.then_branch.accept(self)
+            if stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+        stmt.then_branch = self.optimize_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = self.optimize_branch(stmt.else_branch)
+        return stmt
+
+    def visit_while_stmt(self, stmt: Stmt.While) -> Stmt.Stmt | None:
+        stmt.condition = self.fold(stmt.condition)
+        if isinstance(stmt.condition, Expr.Literal) and not is_truthy(stmt.condition.value):
+            return None
+        stmt.body = self.optimize_branch(stmt.body)
+        return stmt
+
+    def visit_function_stmt(self, stmt: Stmt.Function):
+        stmt.body = self.optimize_block(stmt.body)
+        return stmt
+
+    def visit_return_stmt(self, stmt: Stmt.Return):
+        if stmt.value is not None:
+            stmt.value = self.fold(stmt.value)
+        return stmt
+
+    def visit_class_stmt(self, stmt: Stmt.Class):
+        for method in stmt.methods:
+            self.visit_function_stmt(method)
+        return stmt
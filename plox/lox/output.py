@@ -0,0 +1,35 @@
+import sys
+
+BUFFER_SIZE = 1 << 16
+
+
+# Default sink for print. Output is collected in memory and handed to the
+# stream in large writes; interpreters flush it whenever a run ends, so
+# nothing is held back across an exit, a runtime error or a REPL prompt.
+# Lines go straight through when the stream is a terminal.
+class BufferedOutput:
+    __slots__ = ("stream", "parts", "size", "limit")
+
+    def __init__(self, stream=None, limit: int | None = None) -> None:
+        self.stream = stream
+        self.parts: list[str] = []
+        self.size = 0
+        if limit is None:
+            target = sys.stdout if stream is None else stream
+            limit = 1 if target.isatty() else BUFFER_SIZE
+        self.limit = limit
+
+    def write(self, text: str) -> int:
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.limit:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        stream = sys.stdout if self.stream is None else self.stream
+        if self.parts:
+            stream.write("".join(self.parts))
+            self.parts.clear()
+            self.size = 0
+        stream.flush()
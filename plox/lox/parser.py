@@ -28,7 +28,7 @@ call        ->  primary ("(" arguments? ")" | "." IDENTIFIER)*;
 arguments   ->  expression ("," expression)*;
 primary     ->  "true" | "false" | "nil" | "this" | NUMBER | STRING | "(" expression ")" | IDENTIFIER | "super" "." IDENTIFIER;
 """
-from typing import List
+from collections.abc import Iterable
 
 import lox.expr as Expr
 import lox.stmt as Stmt
@@ -37,12 +37,13 @@ from lox.tokentype import TokenType
 from lox.token import Token
 
 class Parser:
-    def __init__(self, tokens: List[Token]) -> None:
-        self.tokens = tokens
-        self.current = 0
-
-    def parse(self) -> List[Stmt.Stmt]:
+    def __init__(self, tokens: Iterable[Token], error_handler: ErrorHandler) -> None:
+        self.error_handler = error_handler
+        self.tokens = iter(tokens)
+        self.previous_token: Token = None
+        self.current_token: Token = next(self.tokens)
 
+    def parse(self) -> list[Stmt.Stmt]:
         statements = []
         while not self.is_at_end():
             statements.append(self.declaration())
@@ -68,7 +69,7 @@ class Parser:
             self.consume(TokenType.IDENTIFIER, "Expect superclass name.")
             superclass = Expr.Variable(self.previous())
         self.consume(TokenType.LEFT_BRACE, "Expect '{' before class body.")
-        methods: List[Stmt.Function] = []
+        methods: list[Stmt.Function] = []
         while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
             methods.append(self.function("method"))
         self.consume(TokenType.RIGHT_BRACE, "Expect '}' after class body.")
@@ -83,7 +84,7 @@ class Parser:
         if not self.check(TokenType.RIGHT_PAREN):
             while True:
                 if len(parameters) >= 255:
-                    error_handler.error_at_token(self.peek(), "Can't have more than 255 parameters.")
+                    self.error_handler.error_at_token(self.peek(), "Can't have more than 255 parameters.")
                 parameters.append(self.consume(TokenType.IDENTIFIER, "Expect parameter name."))
                 if not self.match(TokenType.COMMA):
                     break
@@ -184,7 +185,7 @@ class Parser:
         self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
         return Stmt.Expression(expression)
     
-    def block(self) -> List[Stmt.Stmt]:
+    def block(self) -> list[Stmt.Stmt]:
         statements = []
         while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
             statements.append(self.declaration())
@@ -281,7 +282,7 @@ class Parser:
         if not self.check(TokenType.RIGHT_PAREN):
             while True:
                 if len(arguments) >= 255:
-                    error_handler.error_at_token(self.peek(), "Can't have more than 255 arguments.")
+                    self.error_handler.error_at_token(self.peek(), "Can't have more than 255 arguments.")
                 arguments.append(self.expression())
                 if not self.match(TokenType.COMMA):
                     break
@@ -331,20 +332,21 @@ class Parser:
     
     def advance(self) -> Token:
         if not self.is_at_end():
-            self.current += 1
-        return self.previous()
+            self.previous_token = self.current_token
+            self.current_token = next(self.tokens)
+        return self.previous_token
     
     def is_at_end(self) -> bool:
         return self.peek().type == TokenType.EOF
     
     def peek(self) -> Token:
-        return self.tokens[self.current]
+        return self.current_token
     
     def previous(self) -> Token:
-        return self.tokens[self.current - 1]
+        return self.previous_token
 
     def error(self, token, message):
-        error_handler.error_at_token(token, message)
+        self.error_handler.error_at_token(token, message)
         return ErrorAtParse()
 
     def synchronize(self) -> None:
@@ -0,0 +1,132 @@
+import signal
+import threading
+import time
+from collections import Counter
+
+import lox.expr as Expr
+import lox.stmt as Stmt
+from lox.token import Token
+from lox.loxfun import LoxFunction
+from lox.instrumentation import Instrument, function_label, function_labels
+
+SAMPLE_INTERVAL = 0.001
+SCRIPT = "<script>"
+
+
+def first_line(node) -> int | None:
+    for name in node.__slots__:
+        value = getattr(node, name)
+        if isinstance(value, Token):
+            return value.line
+        if isinstance(value, list):
+            for item in value:
+                line = first_line(item) if isinstance(item, (Expr.Expr, Stmt.Stmt)) else None
+                if line is not None:
+                    return line
+        elif isinstance(value, (Expr.Expr, Stmt.Stmt)):
+            line = first_line(value)
+            if line is not None:
+                return line
+    return None
+
+
+class Frame:
+    __slots__ = ("label", "line")
+
+    def __init__(self, label: str, line: int) -> None:
+        self.label = label
+        self.line = line
+
+
+# Keeps a stack of Lox frames next to the Python one and samples it on a
+# CPU-time timer, so time is charged to Lox functions and lines rather than
+# to the visitor methods that happen to be running.
+class Profiler(Instrument):
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.labels: dict[Stmt.Function, str] = {}
+        self.lines: dict[Stmt.Stmt, int | None] = {}
+        self.frames = [Frame(SCRIPT, 0)]
+        self.calls: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self.line_samples: Counter = Counter()
+        self.samples = 0
+        self.cpu_time = 0.0
+        self.started = 0.0
+        self.stopped = None
+
+    def interpret_started(self, statements: list[Stmt.Stmt]) -> None:
+        self.labels.update(function_labels(statements))
+        self.start()
+
+    def interpret_finished(self) -> None:
+        self.stop()
+
+    def statement_executed(self, statement: Stmt.Stmt) -> None:
+        lines = self.lines
+        if statement in lines:
+            line = lines[statement]
+        else:
+            line = lines[statement] = first_line(statement)
+        if line is not None:
+            self.frames[-1].line = line
+
+    def call_entered(self, function: LoxFunction) -> None:
+        label = function_label(self.labels, function)
+        self.calls[label] += 1
+        self.frames.append(Frame(label, function.declaration.name.line))
+
+    def call_exited(self, function: LoxFunction) -> None:
+        self.frames.pop()
+
+    def sample(self, *args) -> None:
+        frames = self.frames
+        top = frames[-1]
+        self.samples += 1
+        self.stacks[tuple(frame.label for frame in frames)] += 1
+        self.line_samples[(top.label, top.line)] += 1
+
+    def start(self) -> None:
+        self.started = time.process_time()
+        if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGPROF, self.sample)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            return
+        self.stopped = threading.Event()
+        def sampler():
+            while not self.stopped.wait(self.interval):
+                self.sample()
+        threading.Thread(target=sampler, daemon=True).start()
+
+    def stop(self) -> None:
+        self.cpu_time += time.process_time() - self.started
+        if self.stopped is None:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+        else:
+            self.stopped.set()
+            self.stopped = None
+
+    def report(self, out) -> None:
+        total = max(self.samples, 1)
+        inclusive: Counter = Counter()
+        exclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            exclusive[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+        seconds = self.cpu_time / total
+        out.write(f"Lox profile: {self.samples} samples over {self.cpu_time:.3f}s CPU\n\n")
+        out.write(f"{'self%':>7} {'self(s)':>8} {'total%':>7} {'total(s)':>8} {'calls':>10}  function\n")
+        for label in sorted(inclusive.keys() | self.calls.keys(), key=lambda label: (-exclusive[label], -inclusive[label], label)):
+            calls = self.calls[label] if label != SCRIPT else ""
+            out.write(f"{exclusive[label] * 100 / total:7.1f} {exclusive[label] * seconds:8.3f} "
+                      f"{inclusive[label] * 100 / total:7.1f} {inclusive[label] * seconds:8.3f} {calls:>10}  {label}\n")
+        out.write(f"\n{'self%':>7} {'self(s)':>8}  line\n")
+        for (label, line), count in self.line_samples.most_common():
+            out.write(f"{count * 100 / total:7.1f} {count * seconds:8.3f}  {label} line {line}\n")
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{';'.join(stack)} {count}\n")
@@ -1,22 +1,22 @@
-from typing import List, Dict
-
 import lox.expr as Expr
 import lox.stmt as Stmt
 from lox.types import FunctionType, ClassType
-from lox.error import error_handler
+from lox.error import ErrorHandler
 from lox.token import Token
 from lox.interpreter import Interpreter
 
 class Resolver(Expr.Visitor, Stmt.Visitor):
-    def __init__(self, interpreter: Interpreter):
+    def __init__(self, interpreter: Interpreter, error_handler: ErrorHandler):
         self.interpreter = interpreter
-        self.scopes: List[Dict[str, bool]] = []
+        self.error_handler = error_handler
+        self.scopes: list[dict[str, bool]] = []
+        self.slots: list[dict[str, int]] = []
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
 
     def visit_variable_expr(self, expr: Expr.Variable):
         if len(self.scopes) > 0 and expr.name.lexeme in self.scopes[-1] and self.scopes[-1][expr.name.lexeme] == False:
-            error_handler.error_at_token(expr.name, "Can't read local variable in its own initializer.")
+            self.error_handler.error_at_token(expr.name, "Can't read local variable in its own initializer.")
         self.resolve_local(expr, expr.name)
         return None
 
@@ -63,16 +63,18 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
     
     def visit_this_expr(self, expr: Expr.This):
         if self.current_class == ClassType.NONE:
-            error_handler.error_at_token(expr.keyword, "Can't use 'this' outside of a class.")
+            self.error_handler.error_at_token(expr.keyword, "Can't use 'this' outside of a class.")
             return None
         self.resolve_local(expr, expr.keyword)
         return None
     
     def visit_super_expr(self, expr: Expr.Super):
         if self.current_class == ClassType.NONE:
-            error_handler.error_at_token(expr.keyword, "Can't use'super' outside of a class.")
-        elif self.current_class != ClassType.SUBCLASS:
-            error_handler.error_at_token(expr.keyword, "Can't use 'super' in a class with no superclass.")
+            self.error_handler.error_at_token(expr.keyword, "Can't use'super' outside of a class.")
+            return None
+        if self.current_class != ClassType.SUBCLASS:
+            self.error_handler.error_at_token(expr.keyword, "Can't use 'super' in a class with no superclass.")
+            return None
         self.resolve_local(expr, expr.keyword)
         return None
     
@@ -95,7 +97,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.declare(stmt.name)
         self.define(stmt.name)
         if stmt.superclass is not None and stmt.name.lexeme == stmt.superclass.name.lexeme:
-            error_handler.error_at_token(stmt.superclass.name, "A class can't inherit from itself.")
+            self.error_handler.error_at_token(stmt.superclass.name, "A class can't inherit from itself.")
         if stmt.superclass is not None:
             self.current_class = ClassType.SUBCLASS
             self.resolve(stmt.superclass)
@@ -103,8 +105,10 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         if stmt.superclass is not None:
             self.begin_scope()
             self.scopes[-1]["super"] = True
+            self.slots[-1]["super"] = 0
         self.begin_scope()
         self.scopes[-1]["this"] = True
+        self.slots[-1]["this"] = 0
 
         for method in stmt.methods:
             declaration = FunctionType.INITIALIZER if method.name.lexeme == "init" else FunctionType.METHOD
@@ -141,10 +145,12 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
     
     def visit_return_stmt(self, stmt: Stmt.Return):
         if self.current_function == FunctionType.NONE:
-            error_handler.error_at_token(stmt.keyword, "Can't return from top-level code.")
+            self.error_handler.error_at_token(stmt.keyword, "Can't return from top-level code.")
         if stmt.value is not None:
             if self.current_function == FunctionType.INITIALIZER:
-                error_handler.error_at_token(stmt.keyword, "Can't return a value from an initializer.")
+                self.error_handler.error_at_token(stmt.keyword, "Can't return a value from an initializer.")
+            if isinstance(stmt.value, Expr.Call):
+                stmt.value.tail = True
             self.resolve(stmt.value)
         return None
     
@@ -155,9 +161,11 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
 
     def begin_scope(self):
         self.scopes.append({})
+        self.slots.append({})
 
     def end_scope(self):
         self.scopes.pop()
+        self.slots.pop()
 
 
     def declare(self, name: Token):
@@ -165,8 +173,9 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
             return
         scope = self.scopes[-1]
         if name.lexeme in scope:
-            error_handler.error_at_token(name, "Already variable with this name in this scope.")
+            self.error_handler.error_at_token(name, "Already variable with this name in this scope.")
         scope[name.lexeme] = False
+        self.slots[-1][name.lexeme] = len(self.slots[-1])
 
     def define(self, name: Token):
         if len(self.scopes) == 0:
@@ -174,10 +183,11 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.scopes[-1][name.lexeme] = True
 
     def resolve_local(self, expr: Expr.Expr, name: Token):
-        for distance, scope in enumerate(self.scopes[::-1]):
-            if name.lexeme in scope:
-                self.interpreter.resolve(expr, distance)
+        for distance, slots in enumerate(self.slots[::-1]):
+            if name.lexeme in slots:
+                self.interpreter.resolve(expr, distance, slots[name.lexeme])
                 return
+        self.interpreter.resolve_global(expr, name)
             
     def resolve_function(self, function: Stmt.Function, type: FunctionType):
         enclosing_function = self.current_function
@@ -190,7 +200,7 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.end_scope()
         self.current_function = enclosing_function
 
-    def resolve(self, expr: Expr.Expr | Stmt.Stmt | List[Stmt.Stmt]):
+    def resolve(self, expr: Expr.Expr | Stmt.Stmt | list[Stmt.Stmt]):
         if isinstance(expr, list):
             stmts = expr
             for stmt in stmts:
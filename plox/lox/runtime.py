@@ -0,0 +1,94 @@
+from lox.error import ErrorHandler
+from lox.output import BufferedOutput
+
+
+# Everything one Lox program needs between runs: its own error state, output
+# stream, interpreter (or VM) and globals. Runtimes share nothing, so a host
+# can keep as many as it likes and drive each from its own thread.
+class LoxRuntime:
+    def __init__(self, backend: str = "interpreter", optimize: bool = False, use_cache: bool = True,
+                 max_depth: int | None = None, instruments: list | None = None, out=None, err=None) -> None:
+        self.backend = backend
+        self.optimize = optimize
+        self.use_cache = use_cache
+        self.max_depth = max_depth
+        self.instruments = instruments or []
+        self.out = BufferedOutput() if out is None else out
+        self.error_handler = ErrorHandler(self.out, err)
+        self.interpreter = None
+        self.vm = None
+
+    @property
+    def status(self) -> int:
+        if self.error_handler.had_error:
+            return 65
+        if self.error_handler.had_runtime_error:
+            return 70
+        return 0
+
+    def reset(self) -> None:
+        self.error_handler.reset()
+
+    def get_interpreter(self):
+        if self.interpreter is None and self.instruments:
+            from lox.instrumentation import InstrumentedInterpreter
+            self.interpreter = InstrumentedInterpreter(self.instruments, self.error_handler, self.out, self.max_depth)
+        elif self.interpreter is None:
+            from lox.interpreter import Interpreter
+            self.interpreter = Interpreter(self.error_handler, self.out, self.max_depth)
+        return self.interpreter
+
+    def run_file(self, filename: str) -> int:
+        with open(filename, 'r', encoding='utf-8') as f:
+            source = f.read()
+        statements = None
+        if self.use_cache:
+            import lox.cache as cache
+            statements = cache.load(filename, source, self.get_interpreter().globals)
+        if statements is None:
+            statements = self.compile(source)
+            if statements is not None and self.use_cache:
+                cache.store(filename, source, statements)
+        if statements is not None:
+            self.execute(statements)
+        return self.status
+
+    def run(self, source: str) -> int:
+        statements = self.compile(source)
+        if statements is not None:
+            self.execute(statements)
+        return self.status
+
+    def compile(self, source: str):
+        from lox.scanner import Scanner
+        from lox.parser import Parser
+        from lox.resolver import Resolver
+        scanner = Scanner(source, self.error_handler)
+        parser = Parser(scanner.scan(), self.error_handler)
+        statements = parser.parse()
+        if self.error_handler.had_error:
+            return None
+        resolver = Resolver(self.get_interpreter(), self.error_handler)
+        resolver.resolve(statements)
+        if self.error_handler.had_error:
+            return None
+        return statements
+
+    def execute(self, statements) -> None:
+        if self.optimize:
+            from lox.optimizer import Optimizer
+            statements = Optimizer().optimize(statements)
+        if self.backend == "closure":
+            from lox.closure_compiler import ClosureCompiler
+            ClosureCompiler(self.get_interpreter()).interpret(statements)
+        elif self.backend == "vm":
+            from lox.compiler import Compiler
+            from lox.vm import VM
+            function = Compiler(self.error_handler).compile(statements)
+            if self.error_handler.had_error:
+                return
+            if self.vm is None:
+                self.vm = VM(self.error_handler, self.out, self.max_depth)
+            self.vm.interpret(function)
+        else:
+            self.get_interpreter().interpret(statements)
@@ -1,17 +1,43 @@
-from typing import List, Optional
+import re
+import sys
+from collections.abc import Iterator
 
 from lox.tokentype import TokenType
 from lox.token import Token
 from lox.error import *
 
-def is_alpha(c):
-    return c >= 'a' and c <= 'z' or c >= 'A' and c <= 'Z' or c == '_'
+TOKEN_PATTERN = re.compile(r"""
+[ \t\r\n]*(?:
+    (?P<identifier>[A-Za-z_][A-Za-z_0-9]*)
+  | (?P<comment>//[^\n]*)
+  | (?P<operator>[!=<>]=|[(){},.\-+;*!=<>/])
+  | (?P<number>[0-9]+(?:\.[0-9]+)?)
+  | (?P<string>"[^"]*")
+  | (?P<unterminated>"[^"]*)
+  | (?P<error>[^ \t\r\n])
+)""", re.VERBOSE)
 
-def is_digit(c):
-    return c >= '0' and c <= '9'
-
-def is_alpha_digit(c):
-    return is_alpha(c) or is_digit(c)
+OPERATORS = {
+    '(': TokenType.LEFT_PAREN,
+    ')': TokenType.RIGHT_PAREN,
+    '{': TokenType.LEFT_BRACE,
+    '}': TokenType.RIGHT_BRACE,
+    ',': TokenType.COMMA,
+    '.': TokenType.DOT,
+    '-': TokenType.MINUS,
+    '+': TokenType.PLUS,
+    ';': TokenType.SEMICOLON,
+    '*': TokenType.STAR,
+    '/': TokenType.SLASH,
+    '!': TokenType.BANG,
+    '!=': TokenType.BANG_EQUAL,
+    '=': TokenType.EQUAL,
+    '==': TokenType.EQUAL_EQUAL,
+    '<': TokenType.LESS,
+    '<=': TokenType.LESS_EQUAL,
+    '>': TokenType.GREATER,
+    '>=': TokenType.GREATER_EQUAL,
+}
 
 class Scanner:
     keywords = {
@@ -33,113 +59,46 @@ class Scanner:
         'while': TokenType.WHILE
     }
 
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, error_handler: ErrorHandler) -> None:
         self.source = source
+        self.error_handler = error_handler
         self.tokens = []
-        self.start = 0
-        self.current = 0
         self.line = 1
 
-    def scan_tokens(self) -> List[Token]:
-        while not self.is_at_end():
-            self.start = self.current
-            self.scan_token()
-        self.tokens.append(Token(TokenType.EOF, '', None, self.line))
+    def scan_tokens(self) -> list[Token]:
+        self.tokens = list(self.scan())
         return self.tokens
-    
-    def scan_token(self) -> None:
-        c: str = self.advance()
-        match c:
-            case '(': self.add_token(TokenType.LEFT_PAREN)
-            case ')': self.add_token(TokenType.RIGHT_PAREN)
-            case '{': self.add_token(TokenType.LEFT_BRACE)
-            case '}': self.add_token(TokenType.RIGHT_BRACE)
-            case ',': self.add_token(TokenType.COMMA)
-            case '.': self.add_token(TokenType.DOT)
-            case '-': self.add_token(TokenType.MINUS)
-            case '+': self.add_token(TokenType.PLUS)
-            case ';': self.add_token(TokenType.SEMICOLON)
-            case '*': self.add_token(TokenType.STAR)
-            case '!': self.add_token(TokenType.BANG_EQUAL if self.match('=') else TokenType.BANG)
-            case '=': self.add_token(TokenType.EQUAL_EQUAL if self.match('=') else TokenType.EQUAL)
-            case '<': self.add_token(TokenType.LESS_EQUAL if self.match('=') else TokenType.LESS)
-            case '>': self.add_token(TokenType.GREATER_EQUAL if self.match('=') else TokenType.GREATER)
-            case '/':
-                if self.match('/'):
-                    while self.peek() != '\n' and not self.is_at_end():
-                        self.advance()
-                else:
-                    self.add_token(TokenType.SLASH)
-            case ' ':
-                pass
-            case '\r':
-                pass
-            case '\t': 
-                pass
-            case '\n': self.line += 1
-            case '"': self.string()
-            case _:
-                if is_digit(c):
-                    self.number()
-                elif is_alpha(c):
-                    self.identifier()
-                else:
-                    error_handler.error_at_line(self.line, "Unexpected character.")
-
-    def identifier(self) -> None:
-        while is_alpha_digit(self.peek()):
-            self.advance()
-        text: str = self.source[self.start:self.current]
-        type: TokenType = Scanner.keywords.get(text, TokenType.IDENTIFIER)
-        self.add_token(type)
-
-    def number(self) -> None:
-        while is_digit(self.peek()):
-            self.advance()
-        if self.peek() == '.' and is_digit(self.peek_next()):
-            self.advance()
-            while is_digit(self.peek()):
-                self.advance()
-        self.add_token(TokenType.NUMBER, float(self.source[self.start:self.current]))
-
-    def string(self) -> None:
-        while self.peek() != '"' and not self.is_at_end():
-            if self.peek() == '\n':
-                self.line += 1
-            self.advance()
-        if self.is_at_end():
-            error_handler.error_at_line(self.line, "Unterminated string.")
-            return
-        
-        self.advance()
-
-        value: str = self.source[self.start+1:self.current-1]
-        self.add_token(TokenType.STRING, value)
-
-    
-    def match(self, expected: str) -> bool:
-        if self.is_at_end() or self.source[self.current] != expected:
-            return False
-        self.current += 1
-        return True
-    
-    def peek(self) -> str:
-        return self.source[self.current] if not self.is_at_end() else '\0'
-    
-    def peek_next(self) -> str:
-        return self.source[self.current + 1] if self.current + 1 < len(self.source) else '\0'
-    
-    def is_at_end(self) -> bool:
-        return self.current >= len(self.source)
-    
-    def advance(self) -> str:
-        self.current += 1
-        return self.source[self.current-1]
-    
-    def add_token(self, type: TokenType, literal: Optional[object] = None) -> None:
-        text: str = self.source[self.start:self.current]
-        self.tokens.append(Token(type, text, literal, self.line))
-    
-
-    
 
+    def scan(self) -> Iterator[Token]:
+        source = self.source
+        keywords = Scanner.keywords
+        intern = sys.intern
+        line = self.line
+        counted = 0
+        for match in TOKEN_PATTERN.finditer(source):
+            kind = match.lastgroup
+            text = match.group(kind)
+            start, end = match.span(kind)
+            line += source.count('\n', counted, start)
+            counted = start
+            if kind == "identifier":
+                text = intern(text)
+                yield Token(keywords.get(text, TokenType.IDENTIFIER), text, None, line)
+            elif kind == "operator":
+                text = intern(text)
+                yield Token(OPERATORS[text], text, None, line)
+            elif kind == "number":
+                yield Token(TokenType.NUMBER, text, float(text), line)
+            elif kind == "string":
+                line += text.count('\n')
+                counted = end
+                yield Token(TokenType.STRING, text, text[1:-1], line)
+            elif kind == "unterminated":
+                line += text.count('\n')
+                counted = end
+                self.error_handler.error_at_line(line, "Unterminated string.")
+            elif kind == "error":
+                self.error_handler.error_at_line(line, "Unexpected character.")
+        line += source.count('\n', counted)
+        self.line = line
+        yield Token(TokenType.EOF, '', None, line)
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import lox.stmt as Stmt
+from lox.environment import Environment
+from lox.interpreter import Interpreter, Return
+from lox.runtime import LoxRuntime
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7878
+DEFAULT_SLICE = 1000
+DEFAULT_BUDGET = 100_000_000
+DEFAULT_TIMEOUT = 30.0
+MAX_REQUEST = 16 * 1024 * 1024
+
+
+class Interrupted(Exception):
+    pass
+
+
+# Counts statements down from the slice its session was granted and asks for
+# the next one when it runs out, which is where other sessions get their turn.
+class SlicedInterpreter(Interpreter):
+    def __init__(self, session: "Session") -> None:
+        super().__init__(session.error_handler, session.out, session.max_depth)
+        self.session = session
+        self.countdown = 0
+
+    def execute(self, statement: Stmt.Stmt) -> Return | None:
+        if self.countdown == 0:
+            self.countdown = self.session.next_slice()
+        self.countdown -= 1
+        return statement.accept(self)
+
+    def execute_block(self, statements: list[Stmt.Stmt], environment: Environment) -> Return | None:
+        previous = self.environment
+        try:
+            self.environment = environment
+            for statement in statements:
+                completion = self.execute(statement)
+                if completion is not None:
+                    return completion
+            return None
+        finally:
+            self.environment = previous
+
+
+# One client connection. Globals persist across its requests; the statement
+# budget is shared by all of them and the timeout applies to each one.
+class Session(LoxRuntime):
+    def __init__(self, server: "Server") -> None:
+        super().__init__(use_cache=False, max_depth=server.max_depth, out=io.StringIO(), err=io.StringIO())
+        self.server = server
+        self.budget = server.budget
+        self.executed = 0
+        self.deadline = 0.0
+
+    def get_interpreter(self):
+        if self.interpreter is None:
+            self.interpreter = SlicedInterpreter(self)
+        return self.interpreter
+
+    def next_slice(self) -> int:
+        remaining = self.budget - self.executed
+        if remaining <= 0:
+            raise Interrupted("Statement budget exceeded.")
+        if time.monotonic() > self.deadline:
+            raise Interrupted("Timed out.")
+        granted = min(self.server.slice, remaining)
+        self.executed += granted
+        asyncio.run_coroutine_threadsafe(self.server.yield_turn(), self.server.loop).result()
+        return granted
+
+    def evaluate(self, source: str, timeout: float) -> dict:
+        start = time.monotonic()
+        self.deadline = start + timeout
+        executed = self.executed
+        interpreter = self.get_interpreter()
+        try:
+            status = self.run(source)
+        except Interrupted as e:
+            self.error_handler.err.write(f"{e}\n")
+            status = 70
+        # As in plox batch, anything else is a plox bug; it fails this request
+        # but keeps the connection and the session's globals.
+        except Exception:
+            traceback.print_exc(file=self.error_handler.err)
+            status = 70
+        finally:
+            self.executed -= interpreter.countdown
+            interpreter.countdown = 0
+        try:
+            return {
+                "status": status,
+                "output": take(self.out),
+                "errors": take(self.error_handler.err),
+                "statements": self.executed - executed,
+                "seconds": time.monotonic() - start,
+            }
+        finally:
+            self.reset()
+
+
+def rejected(message: str) -> dict:
+    return {"status": 64, "output": "", "errors": f"{message}\n", "statements": 0, "seconds": 0.0}
+
+
+def take(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+# Sessions run on worker threads but only the one holding `turn` executes Lox
+# code; asyncio.Lock hands it to waiters in arrival order, so a session that
+# gives up its turn after each slice goes to the back of the queue.
+class Server:
+    def __init__(self, slice: int = DEFAULT_SLICE, budget: int = DEFAULT_BUDGET, timeout: float = DEFAULT_TIMEOUT,
+                 max_depth: int | None = None, workers: int = 64) -> None:
+        self.slice = slice
+        self.budget = budget
+        self.timeout = timeout
+        self.max_depth = max_depth
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="lox-session")
+        self.workers = asyncio.Semaphore(workers)
+        self.turn = asyncio.Lock()
+        self.loop = None
+
+    async def yield_turn(self) -> None:
+        self.turn.release()
+        await self.turn.acquire()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = Session(self)
+        try:
+            while line := await reader.readline():
+                response = await self.respond(session, line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, session: Session, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            source = request["source"]
+            timeout = float(request.get("timeout", self.timeout))
+        except (ValueError, KeyError, TypeError):
+            return rejected("Invalid request.")
+        # --timeout is the most any request gets; clients can only ask for less.
+        if not math.isfinite(timeout) or timeout <= 0:
+            return rejected("Timeout must be a positive number of seconds.")
+        timeout = min(timeout, self.timeout)
+        # Taking a worker before the turn guarantees the request has a thread
+        # to run on; otherwise it could hold the turn while every worker waits
+        # for it.
+        async with self.workers:
+            await self.turn.acquire()
+            try:
+                return await self.loop.run_in_executor(self.executor, session.evaluate, source, timeout)
+            finally:
+                self.turn.release()
+
+    async def serve(self, host: str, port: int, path: str | None = None) -> None:
+        self.loop = asyncio.get_running_loop()
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path, limit=MAX_REQUEST)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST)
+        async with server:
+            for socket in server.sockets:
+                print(f"Serving Lox on {socket.getsockname()}", flush=True)
+            await server.serve_forever()
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="plox serve", description="Serve Lox evaluation over a local socket, one JSON request per line.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--slice", type=int, default=DEFAULT_SLICE, help="statements a session runs before yielding")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="statements a session may run in total")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="default and maximum seconds per request")
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--workers", type=int, default=64, help="sessions that can have a request in flight")
+    args = parser.parse_args(argv)
+    if args.slice < 1:
+        parser.error("--slice must be positive")
+    server = Server(args.slice, args.budget, args.timeout, args.max_depth, args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.unix is not None and os.path.exists(args.unix):
+            os.remove(args.unix)
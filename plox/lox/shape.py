@@ -0,0 +1,15 @@
+class Shape:
+    __slots__ = ("kclass", "slots", "transitions")
+
+    def __init__(self, kclass, slots: dict[str, int] | None = None) -> None:
+        self.kclass = kclass
+        self.slots: dict[str, int] = {} if slots is None else slots
+        self.transitions: dict[str, Shape] = {}
+
+    def transition(self, name: str) -> "Shape":
+        shape = self.transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = self.transitions[name] = Shape(self.kclass, slots)
+        return shape
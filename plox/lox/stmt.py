@@ -1,40 +1,48 @@
 from abc import ABC, abstractmethod
-from typing import List
 from lox.token import Token
 import lox.expr as Expr
 
-class Stmt(ABC):
-    @abstractmethod
+class Stmt:
+    __slots__ = ()
+
     def accept(self, visitor):
-        pass
+        raise NotImplementedError
 
 
 class Block(Stmt):
-    def __init__(self, statements: List[Stmt]):
-        self.statements: List[Stmt] = statements
+    __slots__ = ("statements",)
+
+    def __init__(self, statements: list[Stmt]):
+        self.statements: list[Stmt] = statements
 
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 
 class Function(Stmt):
-    def __init__(self, name: Token, params: List[Token], body: List[Stmt]):
+    __slots__ = ("name", "params", "body")
+
+    def __init__(self, name: Token, params: list[Token], body: list[Stmt]):
         self.name: Token = name
-        self.params: List[Token] = params
-        self.body: List[Stmt] = body
+        self.params: list[Token] = params
+        self.body: list[Stmt] = body
 
     def accept(self, visitor):
         return visitor.visit_function_stmt(self)
 
 class Class(Stmt):
-    def __init__(self, name: Token, superclass: Expr.Variable, methods: List[Function]):
+    __slots__ = ("name", "superclass", "methods")
+
+    def __init__(self, name: Token, superclass: Expr.Variable, methods: list[Function]):
         self.name: Token = name
         self.superclass: Expr.Variable = superclass
-        self.methods: List[Function] = methods
+        self.methods: list[Function] = methods
 
     def accept(self, visitor):
         return visitor.visit_class_stmt(self)
 
 class Expression(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr.Expr):
         self.expression: Expr.Expr = expression
 
@@ -42,6 +50,8 @@ class Expression(Stmt):
         return visitor.visit_expression_stmt(self)
 
 class Print(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr.Expr):
         self.expression: Expr.Expr = expression
 
@@ -49,6 +59,8 @@ class Print(Stmt):
         return visitor.visit_print_stmt(self)
 
 class If(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
     def __init__(self, condition: Expr.Expr, then_branch: Stmt, else_branch: Stmt):
         self.condition: Expr.Expr = condition
         self.then_branch: Stmt = then_branch
@@ -58,6 +70,8 @@ class If(Stmt):
         return visitor.visit_if_stmt(self)
 
 class While(Stmt):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition: Expr.Expr, body: Stmt):
         self.condition: Expr.Expr = condition
         self.body: Stmt = body
@@ -66,6 +80,8 @@ class While(Stmt):
         return visitor.visit_while_stmt(self)
 
 class Var(Stmt):
+    __slots__ = ("name", "initializer")
+
     def __init__(self, name: Token, initializer: Expr.Expr):
         self.name: Token = name
         self.initializer: Expr.Expr = initializer
@@ -74,6 +90,8 @@ class Var(Stmt):
         return visitor.visit_var_stmt(self)
 
 class Return(Stmt):
+    __slots__ = ("keyword", "value")
+
     def __init__(self, keyword: Token, value: Expr.Expr):
         self.keyword: Token = keyword
         self.value: Expr.Expr = value
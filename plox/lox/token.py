@@ -1,11 +1,19 @@
-from dataclasses import dataclass
-
 from lox.tokentype import TokenType
 
-@dataclass(init=True, repr=True)
 class Token:
-    type: TokenType
-    lexeme: str
-    literal: object
-    line: int
+    __slots__ = ("type", "lexeme", "literal", "line")
+
+    def __init__(self, type: TokenType, lexeme: str, literal: object, line: int) -> None:
+        self.type = type
+        self.lexeme = lexeme
+        self.literal = literal
+        self.line = line
+
+    def __repr__(self) -> str:
+        return f"Token(type={self.type!r}, lexeme={self.lexeme!r}, literal={self.literal!r}, line={self.line!r})"
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not Token:
+            return NotImplemented
+        return (self.type, self.lexeme, self.literal, self.line) == (other.type, other.lexeme, other.literal, other.line)
 
@@ -0,0 +1,385 @@
+from lox.chunk import *
+from lox.error import *
+from lox.token import Token
+from lox.tokentype import TokenType
+from lox.callable import LoxCallable
+from lox.lib import Clock
+from lox.interpreter import stringify
+from lox.output import BufferedOutput
+
+FRAMES_MAX = 1024
+
+
+class ObjUpvalue:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.open = True
+        self.value = None
+
+
+class ObjClosure:
+    def __init__(self, function: ObjFunction) -> None:
+        self.function = function
+        self.upvalues: list[ObjUpvalue] = []
+
+    def __repr__(self) -> str:
+        return repr(self.function)
+
+
+class ObjClass:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.methods: dict[str, ObjClosure] = {}
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class ObjInstance:
+    def __init__(self, kclass: ObjClass) -> None:
+        self.kclass = kclass
+        self.fields: dict[str, object] = {}
+
+    def __repr__(self) -> str:
+        return self.kclass.name + " instancce"
+
+
+class ObjBoundMethod:
+    def __init__(self, receiver: ObjInstance, method: ObjClosure) -> None:
+        self.receiver = receiver
+        self.method = method
+
+    def __repr__(self) -> str:
+        return repr(self.method)
+
+
+class CallFrame:
+    def __init__(self, closure: ObjClosure, slots: int) -> None:
+        self.closure = closure
+        self.ip = 0
+        self.slots = slots
+
+
+class VM:
+    def __init__(self, error_handler: ErrorHandler | None = None, out=None, max_frames: int | None = None) -> None:
+        self.out = BufferedOutput() if out is None else out
+        self.error_handler = ErrorHandler(self.out) if error_handler is None else error_handler
+        self.max_frames = FRAMES_MAX if max_frames is None else max_frames
+        self.stack: list[object] = []
+        self.frames: list[CallFrame] = []
+        self.globals: dict[str, object] = {"clock": Clock()}
+        self.open_upvalues: dict[int, ObjUpvalue] = {}
+
+    def interpret(self, function: ObjFunction) -> None:
+        closure = ObjClosure(function)
+        self.stack.append(closure)
+        self.frames.append(CallFrame(closure, 0))
+        try:
+            self.run()
+        except ErrorAtRuntime as e:
+            self.error_handler.runtime_error(e)
+            self.stack.clear()
+            self.frames.clear()
+            self.open_upvalues.clear()
+        finally:
+            self.out.flush()
+
+    def runtime_error(self, message: str) -> ErrorAtRuntime:
+        frame = self.frames[-1]
+        line = frame.closure.function.chunk.lines[frame.ip - 1]
+        return ErrorAtRuntime(Token(TokenType.EOF, "", None, line), message)
+
+    def capture_upvalue(self, index: int) -> ObjUpvalue:
+        upvalue = self.open_upvalues.get(index)
+        if upvalue is None:
+            upvalue = self.open_upvalues[index] = ObjUpvalue(index)
+        return upvalue
+
+    def close_upvalues(self, last: int) -> None:
+        stack = self.stack
+        for index in [index for index in self.open_upvalues if index >= last]:
+            upvalue = self.open_upvalues.pop(index)
+            upvalue.value = stack[index]
+            upvalue.open = False
+
+    def call(self, closure: ObjClosure, argc: int) -> None:
+        if argc != closure.function.arity:
+            raise self.runtime_error(f"Expected {closure.function.arity} arguments but got {argc}.")
+        if len(self.frames) == self.max_frames:
+            raise self.runtime_error("Stack overflow.")
+        self.frames.append(CallFrame(closure, len(self.stack) - argc - 1))
+
+    def call_value(self, callee: object, argc: int) -> None:
+        if isinstance(callee, ObjClosure):
+            self.call(callee, argc)
+        elif isinstance(callee, ObjBoundMethod):
+            self.stack[-argc - 1] = callee.receiver
+            self.call(callee.method, argc)
+        elif isinstance(callee, ObjClass):
+            self.stack[-argc - 1] = ObjInstance(callee)
+            initializer = callee.methods.get("init")
+            if initializer is not None:
+                self.call(initializer, argc)
+            elif argc != 0:
+                raise self.runtime_error(f"Expected 0 arguments but got {argc}.")
+        elif isinstance(callee, LoxCallable):
+            if argc != callee.arity():
+                raise self.runtime_error(f"Expected {callee.arity()} arguments but got {argc}.")
+            arguments = self.stack[len(self.stack) - argc:]
+            del self.stack[len(self.stack) - argc - 1:]
+            self.stack.append(callee.call(self, arguments))
+        else:
+            raise self.runtime_error("Can only call functions and classes.")
+
+    def invoke_from_class(self, kclass: ObjClass, name: str, argc: int) -> None:
+        method = kclass.methods.get(name)
+        if method is None:
+            raise self.runtime_error(f"Undefined property '{name}'.")
+        self.call(method, argc)
+
+    def invoke(self, name: str, argc: int) -> None:
+        receiver = self.stack[-argc - 1]
+        if not isinstance(receiver, ObjInstance):
+            raise self.runtime_error("Only instances have properties.")
+        value = receiver.fields.get(name, receiver)
+        if value is not receiver:
+            self.stack[-argc - 1] = value
+            self.call_value(value, argc)
+        else:
+            self.invoke_from_class(receiver.kclass, name, argc)
+
+    def bind_method(self, kclass: ObjClass, name: str) -> None:
+        method = kclass.methods.get(name)
+        if method is None:
+            raise self.runtime_error(f"Undefined property '{name}'.")
+        self.stack[-1] = ObjBoundMethod(self.stack[-1], method)
+
+    def run(self) -> None:
+        stack = self.stack
+        frames = self.frames
+        push = stack.append
+        pop = stack.pop
+        write = self.out.write
+        globals = self.globals
+
+        frame = frames[-1]
+        closure = frame.closure
+        code = closure.function.chunk.code
+        constants = closure.function.chunk.constants
+        base = frame.slots
+        ip = frame.ip
+
+        while True:
+            op = code[ip]
+            ip += 1
+            if op == OP_GET_LOCAL:
+                push(stack[base + code[ip]])
+                ip += 1
+            elif op == OP_CONSTANT:
+                push(constants[code[ip] << 8 | code[ip + 1]])
+                ip += 2
+            elif op == OP_GET_GLOBAL:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                value = globals.get(name, globals)
+                if value is globals:
+                    frame.ip = ip
+                    raise self.runtime_error(f"Undefined variable '{name}'.")
+                push(value)
+            elif op == OP_SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif op == OP_POP:
+                pop()
+            elif op == OP_JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += code[ip] << 8 | code[ip + 1]
+                ip += 2
+            elif op == OP_JUMP:
+                ip += (code[ip] << 8 | code[ip + 1]) + 2
+            elif op == OP_LOOP:
+                ip -= (code[ip] << 8 | code[ip + 1]) - 2
+            elif op == OP_ADD:
+                b = pop()
+                a = stack[-1]
+                if isinstance(a, float) and isinstance(b, float) or isinstance(a, str) and isinstance(b, str):
+                    stack[-1] = a + b
+                else:
+                    frame.ip = ip
+                    raise self.runtime_error("Operands must be two numbers or strings.")
+            elif op == OP_SUBTRACT or op == OP_MULTIPLY or op == OP_DIVIDE:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    frame.ip = ip
+                    raise self.runtime_error("Operands must be numbers.")
+                if op == OP_SUBTRACT:
+                    stack[-1] = a - b
+                elif op == OP_MULTIPLY:
+                    stack[-1] = a * b
+                else:
+                    stack[-1] = a / b
+            elif op == OP_LESS or op == OP_LESS_EQUAL or op == OP_GREATER or op == OP_GREATER_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    frame.ip = ip
+                    raise self.runtime_error("Operands must be numbers.")
+                if op == OP_LESS:
+                    stack[-1] = a < b
+                elif op == OP_LESS_EQUAL:
+                    stack[-1] = a <= b
+                elif op == OP_GREATER:
+                    stack[-1] = a > b
+                else:
+                    stack[-1] = a >= b
+            elif op == OP_CALL or op == OP_INVOKE or op == OP_SUPER_INVOKE:
+                if op == OP_CALL:
+                    argc = code[ip]
+                    ip += 1
+                    callee = stack[-argc - 1]
+                    frame.ip = ip
+                    if callee.__class__ is ObjClosure:
+                        self.call(callee, argc)
+                    else:
+                        self.call_value(callee, argc)
+                elif op == OP_INVOKE:
+                    name = constants[code[ip] << 8 | code[ip + 1]]
+                    argc = code[ip + 2]
+                    ip += 3
+                    frame.ip = ip
+                    self.invoke(name, argc)
+                else:
+                    name = constants[code[ip] << 8 | code[ip + 1]]
+                    argc = code[ip + 2]
+                    ip += 3
+                    frame.ip = ip
+                    self.invoke_from_class(pop(), name, argc)
+                frame = frames[-1]
+                closure = frame.closure
+                code = closure.function.chunk.code
+                constants = closure.function.chunk.constants
+                base = frame.slots
+                ip = frame.ip
+            elif op == OP_RETURN:
+                result = pop()
+                if self.open_upvalues:
+                    self.close_upvalues(base)
+                frames.pop()
+                if len(frames) == 0:
+                    pop()
+                    return
+                del stack[base:]
+                push(result)
+                frame = frames[-1]
+                closure = frame.closure
+                code = closure.function.chunk.code
+                constants = closure.function.chunk.constants
+                base = frame.slots
+                ip = frame.ip
+            elif op == OP_GET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                push(stack[upvalue.index] if upvalue.open else upvalue.value)
+            elif op == OP_SET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                if upvalue.open:
+                    stack[upvalue.index] = stack[-1]
+                else:
+                    upvalue.value = stack[-1]
+            elif op == OP_GET_PROPERTY:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                instance = stack[-1]
+                frame.ip = ip
+                if not isinstance(instance, ObjInstance):
+                    raise self.runtime_error("Only instances have properties.")
+                value = instance.fields.get(name, instance)
+                if value is not instance:
+                    stack[-1] = value
+                else:
+                    self.bind_method(instance.kclass, name)
+            elif op == OP_SET_PROPERTY:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                value = pop()
+                instance = stack[-1]
+                if not isinstance(instance, ObjInstance):
+                    frame.ip = ip
+                    raise self.runtime_error("Only instances have fields.")
+                instance.fields[name] = value
+                stack[-1] = value
+            elif op == OP_NIL:
+                push(None)
+            elif op == OP_TRUE:
+                push(True)
+            elif op == OP_FALSE:
+                push(False)
+            elif op == OP_EQUAL or op == OP_NOT_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if a is None or b is None:
+                    equal = a is b
+                else:
+                    equal = a == b
+                stack[-1] = equal if op == OP_EQUAL else not equal
+            elif op == OP_NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == OP_NEGATE:
+                value = stack[-1]
+                if not isinstance(value, float):
+                    frame.ip = ip
+                    raise self.runtime_error("Operand must be a number.")
+                stack[-1] = -value
+            elif op == OP_PRINT:
+                write(stringify(pop()) + "\n")
+            elif op == OP_DEFINE_GLOBAL:
+                globals[constants[code[ip] << 8 | code[ip + 1]]] = pop()
+                ip += 2
+            elif op == OP_SET_GLOBAL:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                if name not in globals:
+                    frame.ip = ip
+                    raise self.runtime_error(f"Undefined variable '{name}'.")
+                globals[name] = stack[-1]
+            elif op == OP_CLOSURE:
+                function = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                new_closure = ObjClosure(function)
+                for _ in range(function.upvalue_count):
+                    is_local = code[ip]
+                    index = code[ip + 1]
+                    ip += 2
+                    if is_local:
+                        new_closure.upvalues.append(self.capture_upvalue(base + index))
+                    else:
+                        new_closure.upvalues.append(closure.upvalues[index])
+                push(new_closure)
+            elif op == OP_CLOSE_UPVALUE:
+                self.close_upvalues(len(stack) - 1)
+                pop()
+            elif op == OP_GET_SUPER:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                frame.ip = ip
+                superclass = pop()
+                self.bind_method(superclass, name)
+            elif op == OP_CLASS:
+                push(ObjClass(constants[code[ip] << 8 | code[ip + 1]]))
+                ip += 2
+            elif op == OP_INHERIT:
+                superclass = stack[-2]
+                if not isinstance(superclass, ObjClass):
+                    frame.ip = ip
+                    raise self.runtime_error("Superclass must be a class.")
+                subclass = pop()
+                subclass.methods.update(superclass.methods)
+            elif op == OP_METHOD:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                method = pop()
+                stack[-1].methods[name] = method
@@ -1,5 +1,4 @@
 import sys
-from typing import List, Optional
 
 def main():
     if len(sys.argv) != 2:
@@ -7,23 +6,23 @@ def main():
         sys.exit(64)
     output_dir = sys.argv[1]
     define_ast(output_dir, "Expr", [
-        "Assign: Token name, Expr value",
+        "Assign: Token name, Expr value; int depth, int slot, object cell",
         "Binary: Expr left, Token operator, Expr right",
-        "Call: Expr callee, Token paren, List[Expr] arguments",
-        "Get: Expr object, Token name",
+        "Call: Expr callee, Token paren, list[Expr] arguments; bool tail",
+        "Get: Expr object, Token name; object cache",
         "Grouping: Expr expression",
         "Literal: object value",
         "Logical: Expr left, Token operator, Expr right",
-        "Set: Expr object, Token name, Expr value",
-        "Super: Token keyword, Token method",
-        "This: Token keyword",
+        "Set: Expr object, Token name, Expr value; object cache",
+        "Super: Token keyword, Token method; int depth, int slot",
+        "This: Token keyword; int depth, int slot",
         "Unary: Token operator, Expr right",
-        "Variable: Token name"
+        "Variable: Token name; int depth, int slot, object cell"
     ])
     define_ast(output_dir, "Stmt", [
-        "Block: List[Stmt] statements",
-        "Function: Token name, List[Token] params, List[Stmt] body",
-        "Class: Token name, Expr.Variable superclass, List[Function] methods",
+        "Block: list[Stmt] statements",
+        "Function: Token name, list[Token] params, list[Stmt] body",
+        "Class: Token name, Expr.Variable superclass, list[Function] methods",
         "Expression: Expr.Expr expression",
         "Print: Expr.Expr expression",
         "If: Expr.Expr condition, Stmt then_branch, Stmt else_branch",
@@ -32,11 +31,10 @@ def main():
         "Return: Token keyword, Expr.Expr value",
     ], "Expr")
 
-def define_ast(output_dir: str, base_name: str, types: List[str], dependency: Optional[str]=None):
+def define_ast(output_dir: str, base_name: str, types: list[str], dependency: str | None=None):
     path = f"{output_dir}/{base_name.lower()}.py"
     with open(path, "w") as f:
         f.write("from abc import ABC, abstractmethod\n")
-        f.write("from typing import List\n")
         f.write("from lox.token import Token\n")
         if dependency is not None:
             f.write(f"import {output_dir.split('/')[-1]}.{dependency.lower()} as {dependency}\n")
@@ -52,12 +50,12 @@ def define_ast(output_dir: str, base_name: str, types: List[str], dependency: Op
         
 
 def define_base_class(fp, base_name: str):
-    fp.write(f"class {base_name}(ABC):\n")
-    fp.write("    @abstractmethod\n")
-    fp.write(f"    def accept(self, visitor):\n")
-    fp.write("        pass\n\n")
+    fp.write(f"class {base_name}:\n")
+    fp.write("    __slots__ = ()\n\n")
+    fp.write("    def accept(self, visitor):\n")
+    fp.write("        raise NotImplementedError\n\n")
 
-def define_visitor(fp, base_name: str, types: List[str]):
+def define_visitor(fp, base_name: str, types: list[str]):
     fp.write("class Visitor(ABC):\n")
     for type in types:
         type_name = type.split(":")[0].strip()
@@ -67,12 +65,24 @@ def define_visitor(fp, base_name: str, types: List[str]):
     
 
 def define_type(fp, base_name: str, class_name: str, field_list: str):
+    field_list, _, state_list = map(str.strip, field_list.partition(";"))
     fp.write(f"class {class_name}({base_name}):\n")
+    names = [field.split(" ")[1] for field in field_list.split(", ")]
+    if state_list:
+        names += [field.split(" ")[1] for field in state_list.split(", ")]
+    slots = ", ".join(f'"{name}"' for name in names)
+    if len(names) == 1:
+        slots += ","
+    fp.write(f"    __slots__ = ({slots})\n\n")
     params = ", ".join([f"{field.split(' ')[1]}: {field.split(' ')[0]}" for field in field_list.split(", ")])
     fp.write(f"    def __init__(self, {params}):\n")
     for field in field_list.split(", "):
         type, name = field.split(" ")
         fp.write(f"        self.{name}: {type} = {name}\n")
+    if state_list:
+        for field in state_list.split(", "):
+            type, name = field.split(" ")
+            fp.write(f"        self.{name}: {type} = None\n")
     fp.write(f"\n    def accept(self, visitor):\n")
     fp.write(f"        return visitor.visit_{class_name.lower()}_{base_name.lower()}(self)\n")
     